@@ -6,7 +6,7 @@ Downloads the latest MAME DAT archive and creates an optimized SQLite database w
 - ROM size limits: 2KB min, 8MB max, power of 2 only
 - Normalized tables: manufacturers, machines, roms, rom_names, machine_roms
 - Binary SHA1/CRC storage
-- Compressed descriptions (zlib)
+- Compressed descriptions (zlib with a shared dictionary, raw UTF-8 if not smaller)
 - Neo-Geo BIOS ROMs in separate entry
 - Orphan reference cleanup
 
@@ -23,12 +23,14 @@ Options:
 Requirements:
     - Python 3.6+
     - py7zr module for 7z extraction: pip install py7zr
+      (not needed if a 7z/7za/7zz command line tool is on PATH, which is faster)
+    - lxml module (optional, faster XML parsing): pip install lxml
 """
 
 import sqlite3
 import xml.etree.ElementTree as ET
 import zlib
-import math
+import json
 import os
 import sys
 import re
@@ -36,10 +38,13 @@ import argparse
 import tempfile
 import zipfile
 import shutil
+import subprocess
+import multiprocessing
+from functools import partial
 from pathlib import Path
 from urllib.request import urlopen, Request
 from urllib.error import URLError
-from html.parser import HTMLParser
+from html import unescape
 
 # Try to import py7zr for 7z support
 try:
@@ -48,6 +53,13 @@ try:
 except ImportError:
     HAS_7Z = False
 
+# Try to import lxml for faster XML parsing (falls back to ElementTree)
+try:
+    import lxml.etree as LET
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
 
 # ============================================================================
 # Constants
@@ -55,33 +67,40 @@ except ImportError:
 
 MIN_ROM_SIZE = 256               # 256 bytes minimum
 MAX_ROM_SIZE = 8 * 1024 * 1024   # 8 MB maximum
+
+# Valid ROM sizes (powers of 2 within limits) -> size_pow2
+VALID_ROM_SIZES = {1 << k: k for k in range(MIN_ROM_SIZE.bit_length() - 1, MAX_ROM_SIZE.bit_length())}
 NEOGEO_BIOS_THRESHOLD = 4000    # ROMs in more machines than this are considered BIOS
 
+# SQLite page sizes: large pages suit the full build, small databases grow with them
+PAGE_SIZE = 4096
+FULL_BUILD_PAGE_SIZE = 32768
+
+DESC_ZLIB_LEVEL = 6
+DESC_DICT_SIZE = 32 * 1024       # zlib window size, largest usable preset dictionary
+DESC_TOKEN_PATTERN = re.compile(r'\([^)]*\)|\[[^\]]*\]|[^\s()\[\]]+')
+
+# SQLite 3.38+ has built-in JSON with the ->> operator (bulk machine_roms insert)
+HAS_JSON_INSERT = sqlite3.sqlite_version_info >= (3, 38, 0)
+
 DAT_INDEX_URL = "https://www.progettosnaps.net/dats/MAME/"
 DAT_DOWNLOAD_BASE = "https://www.progettosnaps.net"
 
+# href of MAME_Dats .7z archive links on the index page
+DAT_LINK_PATTERN = re.compile(r'href\s*=\s*["\']([^"\']*MAME_Dats[^"\']*\.7z[^"\']*)["\']', re.IGNORECASE)
+
+# MAME version in an archive name: digits possibly followed by a beta suffix
+DAT_VERSION_PATTERN = re.compile(r'MAME[_\s]*(?:Dats[_\s]*)?0?(\d+)(?:b\d+)?(?:\.7z|\.zip)', re.IGNORECASE)
+
 USER_AGENT = "Mozilla/5.0 (compatible; MAME-DB-Builder/1.0)"
+DOWNLOAD_CHUNK_SIZE = 1 << 20    # 1 MB
+SEVEN_ZIP_COMMANDS = ('7z', '7za', '7zz')  # 7-Zip / p7zip command line tools
 
 
 # ============================================================================
 # Download Functions
 # ============================================================================
 
-class DATLinkParser(HTMLParser):
-    """Parse HTML to find MAME DAT download links."""
-
-    def __init__(self):
-        super().__init__()
-        self.dat_links = []
-
-    def handle_starttag(self, tag, attrs):
-        if tag == 'a':
-            href = dict(attrs).get('href', '')
-            # Look for MAME_Dats archives only (not diff files)
-            if 'MAME_Dats' in href and '.7z' in href:
-                self.dat_links.append(href)
-
-
 def extract_version(url):
     """Extract MAME version number from URL.
 
@@ -91,15 +110,8 @@ def extract_version(url):
     - MAME_Dats_037b1.7z -> 37 (old beta format)
     - MAME_0.284.7z -> 284
     """
-    # Look for version number pattern: digits possibly followed by letter suffix
-    # Match the last occurrence of a version-like pattern before .7z or .zip
-    match = re.search(r'MAME[_\s]*(?:Dats[_\s]*)?0?(\d+)(?:b\d+)?(?:\.7z|\.zip)', url, re.IGNORECASE)
-    if match:
-        try:
-            return int(match.group(1))
-        except:
-            return 0
-    return 0
+    match = DAT_VERSION_PATTERN.search(url)
+    return int(match.group(1)) if match else 0
 
 
 def get_latest_dat_url():
@@ -114,16 +126,16 @@ def get_latest_dat_url():
         print(f"Error fetching index: {e}")
         return None
 
-    parser = DATLinkParser()
-    parser.feed(html)
+    # Attribute values may contain entities (&amp; in query strings)
+    dat_links = [unescape(href) for href in DAT_LINK_PATTERN.findall(html)]
 
-    if not parser.dat_links:
+    if not dat_links:
         print("No DAT links found on page")
         return None
 
     # Extract versions and find the maximum
     versioned_links = []
-    for link in parser.dat_links:
+    for link in dat_links:
         version = extract_version(link)
         if version > 0:
             versioned_links.append((version, link))
@@ -156,62 +168,124 @@ def download_dat_archive(url, output_dir):
     """Download and extract DAT archive (ZIP or 7z)."""
     print(f"Downloading: {url}")
 
+    # Stream to disk, the archive is a few hundred MB
+    download_path = os.path.join(output_dir, "mame_dats.download")
     try:
         req = Request(url, headers={'User-Agent': USER_AGENT})
-        with urlopen(req, timeout=300) as response:
-            archive_data = response.read()
+        with urlopen(req, timeout=300) as response, open(download_path, 'wb') as f:
+            shutil.copyfileobj(response, f, length=DOWNLOAD_CHUNK_SIZE)
     except URLError as e:
         print(f"Download error: {e}")
         return []
 
-    print(f"Downloaded {len(archive_data) / 1024 / 1024:.1f} MB")
+    print(f"Downloaded {os.path.getsize(download_path) / 1024 / 1024:.1f} MB")
 
     # Determine archive type
-    is_7z = url.endswith('.7z') or archive_data[:6] == b"7z\xbc\xaf'\x1c"
+    with open(download_path, 'rb') as f:
+        signature = f.read(6)
+    is_7z = url.endswith('.7z') or signature == b"7z\xbc\xaf'\x1c"
 
     if is_7z:
-        if not HAS_7Z:
+        if not HAS_7Z and not find_7z_command():
             print("Error: 7z archive detected but py7zr module not installed")
-            print("Install with: pip install py7zr")
+            print("Install with: pip install py7zr (or install the 7z command line tool)")
             return []
-        return extract_7z(archive_data, output_dir)
+        archive_path = os.path.join(output_dir, "mame_dats.7z")
+        os.replace(download_path, archive_path)
+        return extract_7z(archive_path, output_dir)
     else:
-        return extract_zip(archive_data, output_dir)
+        archive_path = os.path.join(output_dir, "mame_dats.zip")
+        os.replace(download_path, archive_path)
+        return extract_zip(archive_path, output_dir)
 
 
-def extract_7z(data, output_dir):
-    """Extract .7z archive and return list of XML DAT files.
+def find_7z_command():
+    """Return the path of a 7-Zip command line tool on PATH, or None."""
+    for name in SEVEN_ZIP_COMMANDS:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def select_dat_members(all_files):
+    """Pick the archive members to extract.
 
     Prefers files from XMLs/ folder (proper XML format) over
     ClrMAME or ROMCenter formats which are not valid XML.
     """
-    archive_path = os.path.join(output_dir, "mame_dats.7z")
-    with open(archive_path, 'wb') as f:
-        f.write(data)
+    xml_files = [f for f in all_files if 'XMLs/' in f and f.lower().endswith('.xml')]
+    if xml_files:
+        print(f"Found {len(xml_files)} XML files in archive")
+        return xml_files
+
+    # Fallback to DAT files if no XMLs folder
+    dat_names = [f for f in all_files if f.lower().endswith('.dat')]
+    print(f"Found {len(dat_names)} DAT files in archive")
+    return dat_names
+
+
+def extracted_paths(output_dir, members):
+    """Return paths of the extracted members that exist on disk."""
+    paths = [os.path.join(output_dir, name) for name in members]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def extract_7z_cli(command, archive_path, output_dir):
+    """Extract DAT files with the 7-Zip command line tool.
+
+    Native (multithreaded) LZMA decoding is much faster than py7zr on the
+    full DAT archive. Returns None if the tool fails.
+    """
+    try:
+        listing = subprocess.run(
+            [command, 'l', '-slt', '--', archive_path],
+            check=True, capture_output=True, text=True, errors='replace'
+        ).stdout
+
+        # Entries follow the "----------" line, one "Path = ..." per member
+        all_files = []
+        in_entries = False
+        for line in listing.splitlines():
+            if line.startswith('----------'):
+                in_entries = True
+            elif in_entries and line.startswith('Path = '):
+                all_files.append(line[len('Path = '):].replace('\\', '/'))
+
+        members = select_dat_members(all_files)
+        if members:
+            subprocess.run(
+                [command, 'x', '-y', f'-o{output_dir}', '--', archive_path] + members,
+                check=True, stdout=subprocess.DEVNULL
+            )
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error running {os.path.basename(command)}: {e}")
+        return None
+
+    return extracted_paths(output_dir, members)
+
+
+def extract_7z(archive_path, output_dir):
+    """Extract .7z archive and return list of XML DAT files.
+
+    Uses the 7z command line tool when available, py7zr otherwise.
+    """
+    command = find_7z_command()
+    if command:
+        dat_files = extract_7z_cli(command, archive_path, output_dir)
+        if dat_files is not None:
+            return dat_files
+        if not HAS_7Z:
+            return []
+        print("Falling back to py7zr")
 
     dat_files = []
     try:
         with py7zr.SevenZipFile(archive_path, mode='r') as archive:
-            all_files = archive.getnames()
-
-            # Prefer XML files from XMLs folder
-            xml_files = [f for f in all_files if 'XMLs/' in f and f.lower().endswith('.xml')]
-            if xml_files:
-                print(f"Found {len(xml_files)} XML files in archive")
-                archive.extractall(path=output_dir)
-                for xml_name in xml_files:
-                    xml_path = os.path.join(output_dir, xml_name)
-                    if os.path.exists(xml_path):
-                        dat_files.append(xml_path)
-            else:
-                # Fallback to DAT files if no XMLs folder
-                dat_names = [f for f in all_files if f.lower().endswith('.dat')]
-                print(f"Found {len(dat_names)} DAT files in archive")
-                archive.extractall(path=output_dir)
-                for dat_name in dat_names:
-                    dat_path = os.path.join(output_dir, dat_name)
-                    if os.path.exists(dat_path):
-                        dat_files.append(dat_path)
+            members = select_dat_members(archive.getnames())
+            # Only write the members we use (skips the ClrMAME/ROMCenter copies)
+            archive.extract(path=output_dir, targets=members)
+            dat_files = extracted_paths(output_dir, members)
 
     except Exception as e:
         print(f"Error extracting 7z: {e}")
@@ -219,39 +293,15 @@ def extract_7z(data, output_dir):
     return dat_files
 
 
-def extract_zip(data, output_dir):
-    """Extract .zip archive and return list of XML DAT files.
-
-    Prefers files from XMLs/ folder (proper XML format) over
-    ClrMAME or ROMCenter formats which are not valid XML.
-    """
-    archive_path = os.path.join(output_dir, "mame_dats.zip")
-    with open(archive_path, 'wb') as f:
-        f.write(data)
-
+def extract_zip(archive_path, output_dir):
+    """Extract .zip archive and return list of XML DAT files."""
     dat_files = []
     try:
         with zipfile.ZipFile(archive_path, 'r') as zf:
-            all_files = zf.namelist()
-
-            # Prefer XML files from XMLs folder
-            xml_files = [f for f in all_files if 'XMLs/' in f and f.lower().endswith('.xml')]
-            if xml_files:
-                print(f"Found {len(xml_files)} XML files in archive")
-                for xml_name in xml_files:
-                    zf.extract(xml_name, output_dir)
-                    xml_path = os.path.join(output_dir, xml_name)
-                    if os.path.exists(xml_path):
-                        dat_files.append(xml_path)
-            else:
-                # Fallback to DAT files if no XMLs folder
-                dat_names = [f for f in all_files if f.lower().endswith('.dat')]
-                print(f"Found {len(dat_names)} DAT files in archive")
-                for dat_name in dat_names:
-                    zf.extract(dat_name, output_dir)
-                    dat_path = os.path.join(output_dir, dat_name)
-                    if os.path.exists(dat_path):
-                        dat_files.append(dat_path)
+            members = select_dat_members(zf.namelist())
+            for name in members:
+                zf.extract(name, output_dir)
+            dat_files = extracted_paths(output_dir, members)
 
     except zipfile.BadZipFile:
         print("Invalid ZIP file")
@@ -263,13 +313,26 @@ def extract_zip(data, output_dir):
 # Database Creation Functions
 # ============================================================================
 
-def create_database(db_path):
+def create_database(db_path, page_size=PAGE_SIZE):
     """Create SQLite database with optimized schema."""
     conn = sqlite3.connect(db_path)
+
+    # Bulk-load settings: no journal, no fsync (rerun the build on failure).
+    # page_size applies to a new file at once, to an existing one at the
+    # VACUUM that ends the build (before the switch to WAL, which locks it).
+    conn.executescript(f"""
+        PRAGMA page_size = {page_size};
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -262144;
+        PRAGMA locking_mode = EXCLUSIVE;
+        PRAGMA foreign_keys = OFF;
+    """)
     cursor = conn.cursor()
 
     # Drop existing tables
-    for table in ['machine_roms', 'machines', 'roms', 'rom_names', 'manufacturers']:
+    for table in ['machine_roms', 'machines', 'roms', 'rom_names', 'manufacturers', 'metadata']:
         cursor.execute(f"DROP TABLE IF EXISTS {table}")
 
     # Create tables
@@ -320,10 +383,22 @@ def create_database(db_path):
         )
     """)
 
+    create_metadata_table(cursor)
+
     conn.commit()
     return conn
 
 
+def create_metadata_table(cursor):
+    """Create the single-row metadata table (missing in older databases)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metadata (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            description_dict BLOB
+        )
+    """)
+
+
 def open_existing_database(db_path):
     """Open existing database and load caches."""
     conn = sqlite3.connect(db_path)
@@ -344,190 +419,298 @@ def load_caches_from_db(conn):
     """Load existing data into caches for incremental updates."""
     cursor = conn.cursor()
 
-    # Load manufacturers
-    manufacturers_cache = {}
-    cursor.execute("SELECT id, name FROM manufacturers")
-    for row in cursor.fetchall():
-        manufacturers_cache[row[1]] = row[0]
-
-    # Load rom_names
-    rom_names_cache = {}
-    cursor.execute("SELECT id, name FROM rom_names")
-    for row in cursor.fetchall():
-        rom_names_cache[row[1]] = row[0]
+    # Build each cache straight from its cursor (no fetchall() lists)
+    manufacturers_cache = {name: id_ for id_, name in cursor.execute("SELECT id, name FROM manufacturers")}
+    rom_names_cache = {name: id_ for id_, name in cursor.execute("SELECT id, name FROM rom_names")}
 
     # Load roms (by SHA1 hex string)
-    roms_cache = {}
-    cursor.execute("SELECT id, sha1, name_id FROM roms")
-    for row in cursor.fetchall():
-        if row[1]:
-            sha1_hex = row[1].hex()
-            roms_cache[sha1_hex] = (row[0], row[2])
+    roms_cache = {
+        sha1.hex(): (id_, name_id)
+        for id_, sha1, name_id in cursor.execute(
+            "SELECT id, sha1, name_id FROM roms WHERE length(sha1) > 0"
+        )
+    }
 
     # Load existing machine names
-    existing_machines = set()
-    cursor.execute("SELECT name FROM machines")
-    for row in cursor.fetchall():
-        existing_machines.add(row[0])
+    existing_machines = {name for (name,) in cursor.execute("SELECT name FROM machines")}
 
-    # Get max machine ID
-    cursor.execute("SELECT MAX(id) FROM machines")
-    max_id = cursor.fetchone()[0] or 0
+    max_id = get_max_id(cursor, 'machines')
 
     return manufacturers_cache, rom_names_cache, roms_cache, existing_machines, max_id
 
 
-def is_valid_rom_size(size):
-    """Check if ROM size is valid (power of 2, within limits)."""
-    if size is None or size < MIN_ROM_SIZE or size > MAX_ROM_SIZE:
-        return False
-    # Check if power of 2
-    return size > 0 and (size & (size - 1)) == 0
-
-
 def parse_machine(machine_elem):
     """Extract machine data and ROMs from XML element."""
     attrs = {
         'name': machine_elem.get('name'),
         'cloneof': machine_elem.get('cloneof'),
         'romof': machine_elem.get('romof'),
+        'description': None,
+        'year': None,
+        'manufacturer': None,
     }
+    roms = []
 
-    # Child elements
-    desc_elem = machine_elem.find('description')
-    attrs['description'] = desc_elem.text if desc_elem is not None else None
+    # Single pass over child elements
+    for child in machine_elem:
+        tag = child.tag
+
+        if tag == 'rom':
+            # Extract ROMs (filter by size)
+            size_str = child.get('size')
+            try:
+                size = int(size_str) if size_str else None
+            except:
+                size = None
+
+            size_pow2 = VALID_ROM_SIZES.get(size)
+            if size_pow2 is None:
+                continue
+
+            sha1 = child.get('sha1')
+            if not sha1:  # Skip ROMs without SHA1 (nodump)
+                continue
+
+            roms.append({
+                'name': child.get('name'),
+                'size_pow2': size_pow2,
+                'crc': child.get('crc'),
+                'sha1': sha1,
+            })
+
+        elif tag == 'description':
+            attrs['description'] = child.text
+
+        elif tag == 'year':
+            if child.text:
+                try:
+                    attrs['year'] = int(child.text[:4])
+                except:
+                    attrs['year'] = None
+
+        elif tag == 'manufacturer':
+            attrs['manufacturer'] = child.text
 
-    year_elem = machine_elem.find('year')
-    if year_elem is not None and year_elem.text:
-        try:
-            attrs['year'] = int(year_elem.text[:4])
-        except:
-            attrs['year'] = None
-    else:
-        attrs['year'] = None
+    return attrs, roms
 
-    manuf_elem = machine_elem.find('manufacturer')
-    attrs['manufacturer'] = manuf_elem.text if manuf_elem is not None else None
 
-    # Extract ROMs (filter by size)
-    roms = []
-    for rom_elem in machine_elem.findall('rom'):
-        size_str = rom_elem.get('size')
-        try:
-            size = int(size_str) if size_str else None
-        except:
-            size = None
-
-        if not is_valid_rom_size(size):
+def get_max_id(cursor, table):
+    """Return the highest id currently used in a table (0 if empty)."""
+    cursor.execute(f"SELECT MAX(id) FROM {table}")
+    return cursor.fetchone()[0] or 0
+
+
+def is_zlib_header(data):
+    """Check if data starts with a valid zlib stream header (RFC 1950)."""
+    return len(data) >= 2 and data[0] == 0x78 and ((data[0] << 8) | data[1]) % 31 == 0
+
+
+def build_desc_dict(descriptions):
+    """Build a zlib preset dictionary from the most common description tokens.
+
+    Tokens are words and whole (...)/[...] groups, weighted by how many bytes
+    they cover. The most valuable ones go last, where zlib reaches them with
+    the shortest distances.
+    """
+    counts = {}
+    for desc in descriptions:
+        for token in DESC_TOKEN_PATTERN.findall(desc):
+            counts[token] = counts.get(token, 0) + 1
+
+    ranked = sorted(
+        ((count * len(token), token) for token, count in counts.items() if count > 1),
+        reverse=True
+    )
+
+    parts = []
+    size = 0
+    for _, token in ranked:
+        data = (token + ' ').encode('utf-8')
+        if size + len(data) > DESC_DICT_SIZE:
+            continue
+        parts.append(data)
+        size += len(data)
+
+    return b''.join(reversed(parts))
+
+
+def compress_desc(text, compressor):
+    """Encode a description for the machines.description BLOB.
+
+    compressor is a zlib compressobj primed with the shared dictionary; it is
+    copied, not consumed. Descriptions that don't get smaller are stored as
+    raw UTF-8, unless they would look like a zlib header to readers.
+    """
+    data = text.encode('utf-8')
+    stream = compressor.copy()
+    blob = stream.compress(data) + stream.flush()
+    if len(blob) < len(data) or is_zlib_header(data):
+        return blob
+    return data
+
+
+def release_element(elem):
+    """Free a processed machine element and its already-processed siblings."""
+    elem.clear()
+    if HAS_LXML:
+        # lxml keeps cleared elements attached to the root, drop them too
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def parse_dat_to_tuples(dat_path, skip_machines=frozenset()):
+    """Parse a DAT file into raw machine tuples, without any database IDs.
+
+    Runs in worker processes when several DAT files are loaded. Returns a dict:
+    - machines: [(name, cloneof, romof, description, year, manufacturer, roms)]
+      with roms as [(rom_name, sha1_hex, crc_hex, size_pow2)]
+    - skipped: number of machines found in skip_machines
+    Returns None if the file can't be opened.
+    """
+    # Parse XML (lxml filters machine/game elements on the C side)
+    try:
+        if HAS_LXML:
+            context = LET.iterparse(dat_path, events=('end',), tag=('machine', 'game'),
+                                    huge_tree=True)
+        else:
+            context = ET.iterparse(dat_path, events=('end',))
+    except Exception as e:
+        print(f"  Error opening file {os.path.basename(dat_path)}: {e}")
+        return None
+
+    machines = []
+    skipped = 0
+
+    for event, elem in context:
+        if not HAS_LXML and elem.tag not in ('machine', 'game'):
             continue
 
-        sha1 = rom_elem.get('sha1')
-        if not sha1:  # Skip ROMs without SHA1 (nodump)
+        # Skip existing machines (first file wins) before walking children
+        attrib = elem.attrib
+        if attrib.get('name') in skip_machines:
+            skipped += 1
+            release_element(elem)
             continue
 
-        rom = {
-            'name': rom_elem.get('name'),
-            'size': size,
-            'crc': rom_elem.get('crc'),
-            'sha1': sha1,
-        }
-        roms.append(rom)
+        machine_attrs, roms = parse_machine(elem)
+        release_element(elem)
 
-    return attrs, roms
+        # Skip machines without valid ROMs or name
+        if not roms or not machine_attrs['name']:
+            continue
+
+        # Kept as text, compressed once the shared dictionary is known
+        desc = machine_attrs['description'] or None
+
+        machines.append((
+            machine_attrs['name'],
+            machine_attrs['cloneof'],
+            machine_attrs['romof'],
+            desc,
+            machine_attrs['year'],
+            machine_attrs['manufacturer'],
+            [(rom['name'], rom['sha1'], rom['crc'], rom['size_pow2']) for rom in roms],
+        ))
+
+    return {'machines': machines, 'skipped': skipped}
+
+
+def load_dat_files(dat_paths, conn, manufacturers_cache, rom_names_cache,
+                   roms_cache, existing_machines, start_machine_id):
+    """Parse DAT files (in parallel if several) and load them in order.
+
+    Returns the last machine ID used.
+    """
+    machine_id = start_machine_id
+    parse = partial(parse_dat_to_tuples, skip_machines=frozenset(existing_machines))
+
+    if len(dat_paths) > 1:
+        # Parse in worker processes, merge serially (caches and "first file
+        # wins" deduplication depend on file order, so keep results ordered)
+        processes = min(len(dat_paths), os.cpu_count() or 1)
+        with multiprocessing.Pool(processes) as pool:
+            for dat_path, parsed in zip(dat_paths, pool.imap(parse, dat_paths)):
+                _, _, machine_id = process_dat_file(
+                    dat_path, parsed, conn,
+                    manufacturers_cache, rom_names_cache, roms_cache,
+                    existing_machines, machine_id
+                )
+    else:
+        for dat_path in dat_paths:
+            _, _, machine_id = process_dat_file(
+                dat_path, parse(dat_path), conn,
+                manufacturers_cache, rom_names_cache, roms_cache,
+                existing_machines, machine_id
+            )
 
+    return machine_id
 
-def process_dat_file(dat_path, conn, manufacturers_cache, rom_names_cache,
+
+def process_dat_file(dat_path, parsed, conn, manufacturers_cache, rom_names_cache,
                      roms_cache, existing_machines, start_machine_id):
-    """Process DAT file and populate database."""
+    """Populate database from a parsed DAT file (see parse_dat_to_tuples)."""
     print(f"Processing: {os.path.basename(dat_path)}")
     cursor = conn.cursor()
 
     machines_data = []        # [(id, name, cloneof, romof, desc, year, manuf_id)]
     machine_roms_data = []    # [(machine_id, rom_id, name_id)]
+    new_manufacturers = []    # [(id, name)]
+    new_rom_names = []        # [(id, name)]
+    pending_roms = []         # [(id, sha1_hex, crc_hex, size_pow2, name_id)]
 
     machine_id = start_machine_id
     machines_added = 0
-    machines_skipped = 0
     roms_added = 0
 
-    # Parse XML
-    try:
-        context = ET.iterparse(dat_path, events=('end',))
-    except Exception as e:
-        print(f"  Error opening file: {e}")
+    if parsed is None:
         return 0, 0, machine_id
+    machines_skipped = parsed['skipped']
 
-    for event, elem in context:
-        if elem.tag not in ('machine', 'game'):
-            continue
+    # Whole DAT is loaded in a single transaction
+    if not conn.in_transaction:
+        cursor.execute("BEGIN")
 
-        machine_attrs, roms = parse_machine(elem)
-
-        # Skip machines without valid ROMs or name
-        if not roms or not machine_attrs['name']:
-            elem.clear()
-            continue
+    # Pre-allocate IDs so new rows never need cursor.lastrowid
+    manuf_next_id = get_max_id(cursor, 'manufacturers') + 1
+    rom_name_next_id = get_max_id(cursor, 'rom_names') + 1
+    rom_next_id = get_max_id(cursor, 'roms') + 1
 
+    for name, cloneof, romof, desc, year, manuf_name, roms in parsed['machines']:
         # Skip existing machines (first file wins)
-        if machine_attrs['name'] in existing_machines:
+        if name in existing_machines:
             machines_skipped += 1
-            elem.clear()
             continue
 
         machine_id += 1
-        existing_machines.add(machine_attrs['name'])
+        existing_machines.add(name)
 
         # Get/create manufacturer
-        manuf_name = machine_attrs['manufacturer']
         if manuf_name:
             if manuf_name not in manufacturers_cache:
-                cursor.execute("INSERT INTO manufacturers (name) VALUES (?)", (manuf_name,))
-                manufacturers_cache[manuf_name] = cursor.lastrowid
+                manufacturers_cache[manuf_name] = manuf_next_id
+                new_manufacturers.append((manuf_next_id, manuf_name))
+                manuf_next_id += 1
             manuf_id = manufacturers_cache[manuf_name]
         else:
             manuf_id = None
 
-        # Compress description
-        desc = machine_attrs['description']
-        if desc:
-            desc_blob = zlib.compress(desc.encode('utf-8'), level=9)
-        else:
-            desc_blob = None
-
         # Store machine data (cloneof/romof resolved later)
-        machines_data.append((
-            machine_id,
-            machine_attrs['name'],
-            machine_attrs['cloneof'],
-            machine_attrs['romof'],
-            desc_blob,
-            machine_attrs['year'],
-            manuf_id
-        ))
+        machines_data.append((machine_id, name, cloneof, romof, desc, year, manuf_id))
 
         # Process ROMs
-        for rom in roms:
-            sha1 = rom['sha1']
-            rom_name = rom['name']
-
+        for rom_name, sha1, crc, size_pow2 in roms:
             # Get/create rom_name
             if rom_name not in rom_names_cache:
-                cursor.execute("INSERT INTO rom_names (name) VALUES (?)", (rom_name,))
-                rom_names_cache[rom_name] = cursor.lastrowid
+                rom_names_cache[rom_name] = rom_name_next_id
+                new_rom_names.append((rom_name_next_id, rom_name))
+                rom_name_next_id += 1
             name_id = rom_names_cache[rom_name]
 
             # Get/create ROM by SHA1
             if sha1 not in roms_cache:
-                sha1_bin = bytes.fromhex(sha1)
-                crc_bin = bytes.fromhex(rom['crc']) if rom['crc'] else None
-                size_pow2 = int(math.log2(rom['size']))
-
-                cursor.execute("""
-                    INSERT INTO roms (sha1, crc, size_pow2, name_id)
-                    VALUES (?, ?, ?, ?)
-                """, (sha1_bin, crc_bin, size_pow2, name_id))
-
-                roms_cache[sha1] = (cursor.lastrowid, name_id)
+                pending_roms.append((rom_next_id, sha1, crc, size_pow2, name_id))
+                roms_cache[sha1] = (rom_next_id, name_id)
+                rom_next_id += 1
                 roms_added += 1
 
             rom_id, _ = roms_cache[sha1]
@@ -537,33 +720,63 @@ def process_dat_file(dat_path, conn, manufacturers_cache, rom_names_cache,
         if machines_added % 10000 == 0:
             print(f"    {machines_added} machines, {roms_added} unique ROMs...")
 
-        elem.clear()
-
     print(f"    Added: {machines_added} machines, {roms_added} ROMs | Skipped: {machines_skipped} duplicates")
 
-    # Create name -> id mapping for cloneof/romof resolution
-    name_to_id = {m[1]: m[0] for m in machines_data}
+    # Each table is filled by a single statement over all its rows: an
+    # executemany() (one prepared statement), or one json_each() bind for
+    # machine_roms when SQLite supports it
+    cursor.executemany("INSERT INTO manufacturers (id, name) VALUES (?, ?)", new_manufacturers)
+    cursor.executemany("INSERT INTO rom_names (id, name) VALUES (?, ?)", new_rom_names)
 
-    # Also load existing machine name -> id mappings
-    cursor.execute("SELECT id, name FROM machines")
-    for row in cursor.fetchall():
-        name_to_id[row[1]] = row[0]
+    # SHA1/CRC hex strings are converted to binary columns on the fly
+    cursor.executemany("""
+        INSERT INTO roms (id, sha1, crc, size_pow2, name_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, (
+        (id_, bytes.fromhex(sha1), bytes.fromhex(crc) if crc else None, size_pow2, name_id)
+        for id_, sha1, crc, size_pow2, name_id in pending_roms
+    ))
+
+    # Insert machines, cloneof/romof names are resolved below
+    cursor.executemany("""
+        INSERT INTO machines (id, name, description, year, manufacturer_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, ((id_, name, desc, year, manuf_id)
+          for id_, name, cloneof, romof, desc, year, manuf_id in machines_data))
 
-    # Insert machines with resolved references
-    for m in machines_data:
-        id_, name, cloneof, romof, desc, year, manuf_id = m
-        cloneof_id = name_to_id.get(cloneof)
-        romof_id = name_to_id.get(romof)
-        cursor.execute("""
-            INSERT INTO machines (id, name, cloneof_id, romof_id, description, year, manufacturer_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (id_, name, cloneof_id, romof_id, desc, year, manuf_id))
+    # Resolve cloneof/romof names to machine IDs in SQL
+    cursor.execute("""
+        CREATE TEMP TABLE pending_refs (
+            machine_id INTEGER PRIMARY KEY,
+            cloneof_name TEXT,
+            romof_name TEXT
+        )
+    """)
+    cursor.executemany("INSERT INTO pending_refs VALUES (?, ?, ?)",
+                       ((m[0], m[2], m[3]) for m in machines_data if m[2] or m[3]))
+    cursor.execute("""
+        UPDATE machines SET
+            cloneof_id = (SELECT m2.id FROM pending_refs p
+                          JOIN machines m2 ON m2.name = p.cloneof_name
+                          WHERE p.machine_id = machines.id),
+            romof_id = (SELECT m2.id FROM pending_refs p
+                        JOIN machines m2 ON m2.name = p.romof_name
+                        WHERE p.machine_id = machines.id)
+        WHERE id IN (SELECT machine_id FROM pending_refs)
+    """)
+    cursor.execute("DROP TABLE pending_refs")
 
-    # Insert machine_roms
-    cursor.executemany("""
-        INSERT INTO machine_roms (machine_id, rom_id, name_id)
-        VALUES (?, ?, ?)
-    """, machine_roms_data)
+    # Insert machine_roms (one JSON bind unpacked by SQLite when available)
+    if HAS_JSON_INSERT:
+        cursor.execute("""
+            INSERT INTO machine_roms (machine_id, rom_id, name_id)
+            SELECT value->>0, value->>1, value->>2 FROM json_each(?)
+        """, (json.dumps(machine_roms_data),))
+    else:
+        cursor.executemany("""
+            INSERT INTO machine_roms (machine_id, rom_id, name_id)
+            VALUES (?, ?, ?)
+        """, machine_roms_data)
 
     conn.commit()
     return machines_added, roms_added, machine_id
@@ -583,6 +796,9 @@ def create_indexes(conn):
         ("idx_roms_sha1", "CREATE INDEX idx_roms_sha1 ON roms(sha1)"),
         ("idx_roms_crc", "CREATE INDEX idx_roms_crc ON roms(crc)"),
         ("idx_roms_name_id", "CREATE INDEX idx_roms_name_id ON roms(name_id)"),
+        # Covers the embedded generator's ROM query (valid SHA1s in size/SHA1 order)
+        ("idx_roms_valid", "CREATE INDEX idx_roms_valid ON roms(size_pow2, sha1, name_id) "
+                           "WHERE sha1 IS NOT NULL AND length(sha1) = 20"),
         ("idx_machines_name", "CREATE INDEX idx_machines_name ON machines(name)"),
         ("idx_machines_cloneof_id", "CREATE INDEX idx_machines_cloneof_id ON machines(cloneof_id)"),
         ("idx_machines_romof_id", "CREATE INDEX idx_machines_romof_id ON machines(romof_id)"),
@@ -596,6 +812,8 @@ def create_indexes(conn):
         if idx_name not in existing:
             cursor.execute(idx_sql)
 
+    # Refresh planner statistics for query time
+    cursor.execute("ANALYZE")
     conn.commit()
 
 
@@ -608,8 +826,11 @@ def drop_indexes(conn):
     conn.commit()
 
 
-def extract_neogeo_bios(conn):
-    """Move Neo-Geo BIOS ROMs to separate entry."""
+def extract_neogeo_bios(conn, next_id, manufacturers_cache):
+    """Move Neo-Geo BIOS ROMs to separate entry.
+
+    next_id is the first free machine ID, as returned by load_dat_files().
+    """
     print("Extracting Neo-Geo BIOS ROMs...")
     cursor = conn.cursor()
 
@@ -619,12 +840,15 @@ def extract_neogeo_bios(conn):
         print("  neogeo_bios entry already exists, skipping")
         return
 
+    # Bulk load runs without indexes; build the rom_id one now so the
+    # aggregation below is an index scan (create_indexes keeps it)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_machine_roms_rom ON machine_roms(rom_id)")
+
     # Find ROMs with more than threshold occurrences
     cursor.execute(f"""
-        SELECT r.id, COUNT(mr.machine_id) as cnt
-        FROM machine_roms mr
-        JOIN roms r ON mr.rom_id = r.id
-        GROUP BY mr.rom_id
+        SELECT rom_id, COUNT(*) as cnt
+        FROM machine_roms
+        GROUP BY rom_id
         HAVING cnt > {NEOGEO_BIOS_THRESHOLD}
     """)
     bios_roms = cursor.fetchall()
@@ -637,42 +861,32 @@ def extract_neogeo_bios(conn):
     print(f"  Found {len(bios_rom_ids)} BIOS ROMs")
 
     # Get/create SNK manufacturer
-    cursor.execute("SELECT id FROM manufacturers WHERE name = 'SNK'")
-    row = cursor.fetchone()
-    if row:
-        snk_id = row[0]
-    else:
+    snk_id = manufacturers_cache.get('SNK')
+    if snk_id is None:
         cursor.execute("INSERT INTO manufacturers (name) VALUES ('SNK')")
         snk_id = cursor.lastrowid
+        manufacturers_cache['SNK'] = snk_id
 
     # Create neogeo_bios machine entry
-    desc = zlib.compress(
-        "Neo-Geo BIOS ROMs - Shared system ROMs for all Neo-Geo games (MVS/AES)".encode('utf-8'),
-        level=9
-    )
+    desc = "Neo-Geo BIOS ROMs - Shared system ROMs for all Neo-Geo games (MVS/AES)"
 
-    cursor.execute("SELECT MAX(id) FROM machines")
-    max_id = cursor.fetchone()[0] or 0
-    neogeo_id = max_id + 1
+    neogeo_id = next_id
 
     cursor.execute("""
         INSERT INTO machines (id, name, cloneof_id, romof_id, description, year, manufacturer_id)
         VALUES (?, 'neogeo_bios', NULL, NULL, ?, 1990, ?)
     """, (neogeo_id, desc, snk_id))
 
-    # Count current links
     placeholders = ','.join('?' * len(bios_rom_ids))
-    cursor.execute(f"SELECT COUNT(*) FROM machine_roms WHERE rom_id IN ({placeholders})", bios_rom_ids)
-    links_before = cursor.fetchone()[0]
 
-    # Add links to neogeo_bios
-    for rom_id in bios_rom_ids:
-        cursor.execute("SELECT name_id FROM machine_roms WHERE rom_id = ? LIMIT 1", (rom_id,))
-        name_id = cursor.fetchone()[0]
-        cursor.execute("""
-            INSERT INTO machine_roms (machine_id, rom_id, name_id)
-            VALUES (?, ?, ?)
-        """, (neogeo_id, rom_id, name_id))
+    # Add links to neogeo_bios (one name per ROM, lowest name_id wins)
+    cursor.execute(f"""
+        INSERT INTO machine_roms (machine_id, rom_id, name_id)
+        SELECT ?, rom_id, MIN(name_id)
+        FROM machine_roms
+        WHERE rom_id IN ({placeholders})
+        GROUP BY rom_id
+    """, [neogeo_id] + bios_rom_ids)
 
     # Remove BIOS links from other machines
     cursor.execute(f"""
@@ -700,11 +914,14 @@ def cleanup_orphans(conn):
     machines_deleted = cursor.rowcount
     print(f"  Removed {machines_deleted} machines without ROMs")
 
-    # Remove orphan ROM names
+    # Remove orphan ROM names (set difference: one pass over each table)
     cursor.execute("""
         DELETE FROM rom_names
-        WHERE id NOT IN (SELECT name_id FROM roms WHERE name_id IS NOT NULL)
-        AND id NOT IN (SELECT name_id FROM machine_roms WHERE name_id IS NOT NULL)
+        WHERE id IN (
+            SELECT id FROM rom_names
+            EXCEPT SELECT name_id FROM roms
+            EXCEPT SELECT name_id FROM machine_roms
+        )
     """)
     names_deleted = cursor.rowcount
     print(f"  Removed {names_deleted} orphan ROM names")
@@ -735,9 +952,58 @@ def cleanup_orphans(conn):
     conn.commit()
 
 
+def compress_descriptions(conn):
+    """Compress newly loaded descriptions with the shared zlib dictionary.
+
+    Descriptions are inserted as TEXT during the load and stored as BLOB once
+    compressed. The dictionary is built on the first run and reused when DAT
+    files are added later, since existing rows depend on it.
+    """
+    print("Compressing descriptions...")
+    cursor = conn.cursor()
+    create_metadata_table(cursor)
+
+    cursor.execute("SELECT id, description FROM machines WHERE typeof(description) = 'text'")
+    rows = cursor.fetchall()
+    if not rows:
+        print("  No new descriptions")
+        return
+
+    cursor.execute("SELECT description_dict FROM metadata WHERE id = 1")
+    row = cursor.fetchone()
+    if row and row[0]:
+        zdict = row[0]
+    else:
+        zdict = build_desc_dict(desc for _, desc in rows)
+        cursor.execute("INSERT OR REPLACE INTO metadata (id, description_dict) VALUES (1, ?)", (zdict,))
+
+    compressor = zlib.compressobj(DESC_ZLIB_LEVEL, zdict=zdict)
+    updates = [(compress_desc(desc, compressor), machine_id) for machine_id, desc in rows]
+    cursor.executemany("UPDATE machines SET description = ? WHERE id = ?", updates)
+
+    raw_size = sum(len(desc.encode('utf-8')) for _, desc in rows)
+    stored_size = sum(len(blob) for blob, _ in updates)
+    print(f"  {len(rows)} descriptions: {raw_size} -> {stored_size} bytes "
+          f"(dictionary: {len(zdict)} bytes)")
+
+    conn.commit()
+
+
+def finalize_database(conn):
+    """Restore durable settings once the bulk load is finished."""
+    conn.commit()
+    conn.executescript("""
+        PRAGMA locking_mode = NORMAL;
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA foreign_keys = ON;
+    """)
+
+
 def optimize_database(conn):
-    """Run VACUUM to optimize database file."""
+    """Run VACUUM to optimize database file (and apply a new page_size)."""
     print("Optimizing database...")
+    conn.commit()
     conn.execute("VACUUM")
 
 
@@ -783,7 +1049,7 @@ Examples:
   python3 build_mame_database.py --no-download
 
 Requirements:
-  For 7z archive support: pip install py7zr
+  For 7z archive support: pip install py7zr (or install the 7z command line tool)
 """
     )
     parser.add_argument('--no-download', action='store_true',
@@ -806,10 +1072,10 @@ Requirements:
         print("Error: --add-dat requires --dat-file")
         sys.exit(1)
 
-    # Check py7zr availability
-    if not HAS_7Z and not args.no_download and not args.dat_file:
+    # Check 7z support (py7zr or command line tool)
+    if not HAS_7Z and not find_7z_command() and not args.no_download and not args.dat_file:
         print("Warning: py7zr module not installed")
-        print("Install with: pip install py7zr")
+        print("Install with: pip install py7zr (or install the 7z command line tool)")
         print("Or use --dat-file to specify a pre-extracted DAT file")
         sys.exit(1)
 
@@ -837,16 +1103,18 @@ Requirements:
         drop_indexes(conn)
 
         # Process DAT file
-        machines, roms, _ = process_dat_file(
-            args.dat_file, conn,
+        load_dat_files(
+            [args.dat_file], conn,
             manufacturers_cache, rom_names_cache, roms_cache,
             existing_machines, max_id
         )
 
-        # Recreate indexes
-        create_indexes(conn)
+        # Recreate indexes once everything is loaded
         cleanup_orphans(conn)
+        compress_descriptions(conn)
+        create_indexes(conn)
         optimize_database(conn)
+        finalize_database(conn)
         print_stats(conn, str(db_path))
         conn.close()
         print(f"\nDatabase updated: {db_path}")
@@ -860,22 +1128,25 @@ Requirements:
 
         print(f"\nCreating database: {db_path}")
         conn = create_database(str(db_path))
+        drop_indexes(conn)
 
         manufacturers_cache = {}
         rom_names_cache = {}
         roms_cache = {}
         existing_machines = set()
 
-        machines, roms, _ = process_dat_file(
-            args.dat_file, conn,
+        machine_id = load_dat_files(
+            [args.dat_file], conn,
             manufacturers_cache, rom_names_cache, roms_cache,
             existing_machines, 0
         )
 
-        create_indexes(conn)
-        extract_neogeo_bios(conn)
+        extract_neogeo_bios(conn, machine_id + 1, manufacturers_cache)
         cleanup_orphans(conn)
+        compress_descriptions(conn)
+        create_indexes(conn)
         optimize_database(conn)
+        finalize_database(conn)
         print_stats(conn, str(db_path))
         conn.close()
         print(f"\nDatabase created: {db_path}")
@@ -895,25 +1166,26 @@ Requirements:
 
         print(f"Found {len(dat_files)} DAT files")
         print(f"\nCreating database: {db_path}")
-        conn = create_database(str(db_path))
+        conn = create_database(str(db_path), FULL_BUILD_PAGE_SIZE)
+        drop_indexes(conn)
 
         manufacturers_cache = {}
         rom_names_cache = {}
         roms_cache = {}
         existing_machines = set()
-        machine_id = 0
 
-        for dat_file in sorted(dat_files):
-            machines, roms, machine_id = process_dat_file(
-                str(dat_file), conn,
-                manufacturers_cache, rom_names_cache, roms_cache,
-                existing_machines, machine_id
-            )
+        machine_id = load_dat_files(
+            [str(f) for f in sorted(dat_files)], conn,
+            manufacturers_cache, rom_names_cache, roms_cache,
+            existing_machines, 0
+        )
 
-        create_indexes(conn)
-        extract_neogeo_bios(conn)
+        extract_neogeo_bios(conn, machine_id + 1, manufacturers_cache)
         cleanup_orphans(conn)
+        compress_descriptions(conn)
+        create_indexes(conn)
         optimize_database(conn)
+        finalize_database(conn)
         print_stats(conn, str(db_path))
         conn.close()
         print(f"\nDatabase created: {db_path}")
@@ -946,13 +1218,13 @@ Requirements:
         print(f"\nExtracted {len(dat_files)} DAT files")
         print(f"Creating database: {db_path}")
 
-        conn = create_database(str(db_path))
+        conn = create_database(str(db_path), FULL_BUILD_PAGE_SIZE)
+        drop_indexes(conn)
 
         manufacturers_cache = {}
         rom_names_cache = {}
         roms_cache = {}
         existing_machines = set()
-        machine_id = 0
 
         # Sort DAT files - process main MAME DAT first
         def sort_key(path):
@@ -965,18 +1237,19 @@ Requirements:
 
         # Process all DAT files
         print("\n" + "-" * 60)
-        for dat_file in dat_files:
-            machines, roms, machine_id = process_dat_file(
-                dat_file, conn,
-                manufacturers_cache, rom_names_cache, roms_cache,
-                existing_machines, machine_id
-            )
+        machine_id = load_dat_files(
+            dat_files, conn,
+            manufacturers_cache, rom_names_cache, roms_cache,
+            existing_machines, 0
+        )
         print("-" * 60)
 
-        create_indexes(conn)
-        extract_neogeo_bios(conn)
+        extract_neogeo_bios(conn, machine_id + 1, manufacturers_cache)
         cleanup_orphans(conn)
+        compress_descriptions(conn)
+        create_indexes(conn)
         optimize_database(conn)
+        finalize_database(conn)
         print_stats(conn, str(db_path))
         conn.close()
         print(f"\nDatabase created: {db_path}")
@@ -12,14 +12,17 @@
  *   Shared by: kaiserkn, kaiserknj, dankuga, gblchmp, etc. (8 machines)
  *
  * Build (PC/Linux):
- *   gcc -I include -I external/miniz -o example example.c src/mame_rom_database.c \
+ *   gcc -I include -I external/miniz -o example example.c \
+ *       src/mame_rom_database.c src/mame_rom_database_data.c \
  *       external/miniz/miniz.c external/miniz/miniz_tinfl.c external/miniz/miniz_tdef.c
  *
  * Build (Raspberry Pi Pico 2):
- *   Add src/mame_rom_database.c and external/miniz/miniz.c to your CMakeLists.txt
+ *   Add src/mame_rom_database.c, src/mame_rom_database_data.c and
+ *   external/miniz/miniz.c to your CMakeLists.txt
  */
 
 #include <stdio.h>
+#include <stdlib.h>
 #include <string.h>
 #include <stdint.h>
 #include "mame_rom_database.h"
@@ -93,6 +96,16 @@ int main(void) {
         printf("Error: invalid database magic\n");
         return 1;
     }
+
+    // Inflate the strings pool if it was compressed (--compress-strings)
+    uint8_t* strings = NULL;
+    if (hdr->flags & MRDB_FLAG_STRINGS_DEFLATE) {
+        strings = malloc(mrdb_get_strings_size(db));
+    }
+    if (!mrdb_init(db, strings, mrdb_get_strings_size(db))) {
+        printf("Error: cannot inflate the strings pool\n");
+        return 1;
+    }
     printf("MAME Embedded Database v%u\n", hdr->version);
     printf("  ROMs: %u | Machines: %u | Manufacturers: %u\n\n",
            hdr->roms_count, hdr->machines_count, hdr->manufacturers_count);
@@ -114,8 +127,9 @@ int main(void) {
     printf("Searching for SHA1: %s\n", sha1_hex);
     printf("ROM size: %s\n\n", format_size(size_pow2));
 
-    // Binary search in the database
-    const MrdbRom* rom = mrdb_find_rom_by_sha1(db, size_pow2, sha1);
+    // Perfect hash lookup among the ROMs of this size
+    uint32_t rom_id;
+    const MrdbRom* rom = mrdb_find_rom_by_sha1(db, size_pow2, sha1, &rom_id);
 
     if (!rom) {
         printf("ROM not found in database.\n");
@@ -131,8 +145,7 @@ int main(void) {
     #define MAX_MACHINES 16
     MrdbMachineResult results[MAX_MACHINES];
 
-    uint32_t total = mrdb_get_machines_for_rom(db, rom, size_pow2,
-                                                results, MAX_MACHINES);
+    uint32_t total = mrdb_get_machines_for_rom_id(db, rom_id, results, MAX_MACHINES);
 
     printf("This ROM is used by %u machine(s):\n\n", total);
 
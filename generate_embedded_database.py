@@ -6,8 +6,8 @@ Extracts data from the SQLite MAME database and creates an optimized binary
 file for embedding in the arcade_rom_pro firmware.
 
 ID sizes:
-- roms: 24 bits (8-bit size_pow2 + 16-bit index, SHA1 sorted)
-- machine_roms: 24 bits (rom_id, name_id), 16 bits (machine_id)
+- roms: 24 bits (8-bit size_pow2 + 16-bit index, SHA1 perfect hash slot)
+- machine_roms: 32 bits (rom_starts), 24 bits (name_id), 16 bits (machine_id)
 - rom_names: 24 bits
 - manufacturers: 16 bits
 - machines: 16 bits
@@ -18,12 +18,13 @@ ID sizes:
 Binary file structure:
 1. Header (fixed size)
 2. Size index table (for fast ROM lookup by size)
-3. ROMs table (sorted by size_pow2, then SHA1)
+3. ROMs table (by size_pow2, then SHA1 perfect hash slot; SHA1s, name IDs, hash tables)
 4. Machines table
-5. Machine-ROMs mapping (sorted by rom_id)
+5. Machine-ROMs mapping (rom_starts per ROM, then machine_id and name_id columns)
 6. Manufacturers table
 7. ROM names table
 8. Strings pool
+9. Descriptions pool (preset dictionary, then raw deflate streams)
 """
 
 import sqlite3
@@ -32,8 +33,28 @@ import zlib
 import os
 import sys
 import argparse
+import filecmp
+import mmap
+import multiprocessing
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from collections import defaultdict
+
+from build_mame_database import build_desc_dict, is_zlib_header
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy module not installed")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+# Try to import apsw for faster database reads (falls back to sqlite3)
+try:
+    import apsw
+    HAS_APSW = True
+except ImportError:
+    HAS_APSW = False
 
 # ============================================================================
 # Configuration - Modify these values as needed
@@ -48,7 +69,11 @@ DEFAULT_MAX_SIZE_POW2 = 23  # 2^23 = 8 MB
 # ============================================================================
 
 MAGIC = b'MRDB'
-VERSION = 1
+VERSION = 11
+
+# Header flags (byte 0x3C, the descriptions dictionary size follows at 0x3E)
+FLAG_NAME_OFFSET_24 = 0x01  # Manufacturers/ROM names entries are 3-byte pool offsets
+FLAG_STRINGS_DEFLATE = 0x02  # Strings pool is a raw deflate stream (--compress-strings)
 
 NULL_ID_24 = 0xFFFFFF  # NULL value for 24-bit IDs
 NULL_ID_16 = 0xFFFF    # NULL value for 16-bit IDs
@@ -56,35 +81,175 @@ NULL_ID_16 = 0xFFFF    # NULL value for 16-bit IDs
 # Header structure (64 bytes)
 HEADER_SIZE = 64
 
+# SQLite read settings
+FETCH_SIZE = 65536                  # Rows per batch when filling arrays
+READ_MMAP_SIZE = 1 << 30            # Memory-map up to 1 GB of the database
+READ_CACHE_KB = 200000              # Page cache size (~200 MB)
+
+# Description recompression
+DESC_CHUNK_SIZE = 2048              # Descriptions per worker task
+DESC_DICT_SIZE = 16 * 1024          # Shared preset dictionary embedded in the binary
+DESC_DEFLATE_LEVEL = 9
+
+# Strings pool: each string follows its length byte (this value: 255 or more)
+STRING_LENGTH_MAX = 255
+
+# Strings pool compression (--compress-strings)
+STRINGS_DEFLATE_LEVEL = 9
+
+# ROM perfect hash (one per size)
+HASH_BUCKET_SIZE = 4                # Average SHA1s per pilot
+HASH_LOAD_FACTOR = 0.97             # ROMs per table position before remapping
+HASH_PILOT_BATCH = 256              # Pilots tried at once
+
+# In-memory tables (SQL NULL IDs are loaded as 0, IDs start at 1)
+ROM_DTYPE = np.dtype([
+    ('old_id', '<u4'), ('sha1', 'S20'), ('size_pow2', 'u1'), ('name_id', '<u4'),
+])
+MACHINE_DTYPE = np.dtype([
+    ('old_id', '<u4'), ('cloneof_id', '<u4'), ('romof_id', '<u4'),
+    ('year', '<u4'), ('manufacturer_id', '<u4'),
+])
+MACHINE_ROM_DTYPE = np.dtype([
+    ('machine_id', '<u4'), ('rom_id', '<u4'), ('name_id', '<u4'),
+])
+
+# Packed binary records (no padding, 24-bit IDs as 3 little-endian bytes)
+SIZE_INDEX_RECORD = np.dtype([
+    ('start_index', '<u4'), ('count', '<u4'), ('hash_offset', '<u4'),
+    ('bucket_count', '<u2'), ('remap_count', '<u2'),
+])
+MACHINE_RECORD = np.dtype([
+    ('name_offset', '<u4'), ('desc', '<u4'),
+    ('cloneof_id', '<u2'), ('romof_id', '<u2'), ('year', '<u2'), ('manufacturer_id', '<u2'),
+])
+
 # ============================================================================
 # Helper functions
 # ============================================================================
 
-def write_uint24(value):
-    """Pack a 24-bit unsigned integer (little-endian)."""
-    return struct.pack('<I', value)[:3]
+def write_if_changed(path, content):
+    """Write a text file, unless it already holds content (keeps its mtime)."""
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def replace_if_changed(tmp_path, path):
+    """Move tmp_path to path, unless path already has the same content."""
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+
 
+def pack_uint24(values):
+    """Pack an array of 24-bit values as rows of 3 little-endian bytes."""
+    return np.asarray(values).astype('<u4').view(np.uint8).reshape(-1, 4)[:, :3]
 
-def read_uint24(data, offset):
-    """Unpack a 24-bit unsigned integer (little-endian)."""
-    return struct.unpack('<I', data[offset:offset+3] + b'\x00')[0]
 
+def fmix32(values):
+    """MurmurHash3 32-bit finalizer (vectorized, wraps like uint32_t in C)."""
+    h = np.asarray(values, dtype=np.uint32)
+    h = h ^ (h >> np.uint32(16))
+    h = h * np.uint32(0x85EBCA6B)
+    h = h ^ (h >> np.uint32(13))
+    h = h * np.uint32(0xC2B2AE35)
+    return h ^ (h >> np.uint32(16))
+
+
+def build_rom_hash(sha1s):
+    """Build a minimal perfect hash over one size's SHA1s (PTHash scheme).
+
+    SHA1s are uniformly random, so their first two little-endian 32-bit words
+    serve directly as hash values: k0 picks a bucket, and each bucket gets the
+    smallest pilot that sends all of its keys to free slots of a table with
+    HASH_LOAD_FACTOR load, at fmix32(k1 ^ fmix32(pilot)) * table_size >> 32.
+    Slots past the ROM count are remapped to the free slots below it.
+
+    Returns (slots, pilots, remap): the slot of each SHA1, one uint16 pilot
+    per bucket, and the uint16 slot of each table position past the count.
+    """
+    n = len(sha1s)
+    words = np.frombuffer(sha1s.tobytes(), dtype='<u4').reshape(n, 5)
+    k0 = words[:, 0].astype(np.uint64)
+    k1 = words[:, 1]
+    bucket_count = -(-n // HASH_BUCKET_SIZE)
+    table_size = max(n, int(np.ceil(n / HASH_LOAD_FACTOR)))
+
+    buckets = ((k0 * np.uint64(bucket_count)) >> np.uint64(32)).astype(np.int64)
+    by_bucket = np.argsort(buckets, kind='stable')
+    bucket_sizes = np.bincount(buckets, minlength=bucket_count)
+    bucket_starts = np.cumsum(bucket_sizes) - bucket_sizes
+
+    # Place the largest buckets first, while the table is still empty
+    pilots = np.zeros(bucket_count, dtype='<u2')
+    positions = np.empty(n, dtype=np.int64)
+    taken = np.zeros(table_size, dtype=bool)
+    trial = np.arange(HASH_PILOT_BATCH, dtype=np.uint32)
+    for bucket in np.argsort(-bucket_sizes, kind='stable').tolist():
+        size = int(bucket_sizes[bucket])
+        if size == 0:
+            break
+        keys = by_bucket[bucket_starts[bucket]:bucket_starts[bucket] + size]
+        for first in range(0, 0x10000, HASH_PILOT_BATCH):
+            # Table positions of the bucket's keys (rows) for a batch of pilots (columns)
+            mixed = fmix32(k1[keys, None] ^ fmix32(trial + np.uint32(first))[None, :])
+            candidates = ((mixed.astype(np.uint64) * np.uint64(table_size)) >> np.uint64(32)).astype(np.int64)
+            ok = ~taken[candidates].any(axis=0)
+            if size > 1:
+                ordered = np.sort(candidates, axis=0)
+                ok &= (ordered[1:] != ordered[:-1]).all(axis=0)
+            found = np.flatnonzero(ok)
+            if len(found):
+                column = int(found[0])
+                pilots[bucket] = first + column
+                positions[keys] = candidates[:, column]
+                taken[candidates[:, column]] = True
+                break
+        else:
+            raise ValueError(f"No perfect hash pilot found for a bucket of {size} ROMs")
+
+    # Minimal: table positions past n take the free slots below n, in order
+    remap = np.zeros(table_size - n, dtype='<u2')
+    remap[np.flatnonzero(taken[n:])] = np.flatnonzero(~taken[:n])
+    slots = np.where(positions < n, positions, remap[np.maximum(positions - n, 0)])
 
-def make_rom_id(size_pow2, index):
-    """Create ROM ID: size_pow2 in high 8 bits, index in low 16 bits."""
-    if index > 0xFFFF:
-        raise ValueError(f"ROM index {index} exceeds 16-bit limit for size_pow2={size_pow2}")
-    return (size_pow2 << 16) | index
+    return slots, pilots, remap
 
 
-def extract_size_pow2(rom_id):
-    """Extract size_pow2 from ROM ID."""
-    return (rom_id >> 16) & 0xFF
+def fetch_array(cursor, dtype):
+    """Read the remaining rows of a query into a NumPy structured array."""
+    chunks = []
+    rows_iter = iter(cursor)
+    while True:
+        rows = list(islice(rows_iter, FETCH_SIZE))
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=dtype))
+    if not chunks:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(chunks)
 
 
-def extract_rom_index(rom_id):
-    """Extract ROM index from ROM ID."""
-    return rom_id & 0xFFFF
+def build_lut(old_ids, new_ids, null_id):
+    """Build a lookup array indexed by old ID (SQLite IDs are small and dense)."""
+    lut = np.full(int(old_ids.max()) + 1 if len(old_ids) else 1, null_id, dtype=np.uint32)
+    lut[old_ids] = new_ids
+    return lut
+
+
+def lookup_ids(lut, old_ids, null_id):
+    """Map old IDs through a lookup array; 0 (NULL) and unknown IDs give null_id."""
+    new_ids = np.full(len(old_ids), null_id, dtype=np.uint32)
+    known = (old_ids > 0) & (old_ids < len(lut))
+    new_ids[known] = lut[old_ids[known]]
+    return new_ids
 
 
 # ============================================================================
@@ -95,80 +260,89 @@ def load_database(db_path, min_size_pow2, max_size_pow2):
     """Load all data from SQLite database."""
     print(f"Loading database: {db_path}")
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    # apsw and sqlite3 cursors are used the same way below: execute(),
+    # fetchone() and iteration over plain tuple rows
+    if HAS_APSW:
+        conn = apsw.Connection(db_path, flags=apsw.SQLITE_OPEN_READONLY)
+    else:
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
+    # Read pages through mmap and keep them cached for the full-table scans
+    cursor.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size = -{READ_CACHE_KB}")
+
+    # No row factory: rows stay plain tuples, read straight from the cursor or
+    # in batches of FETCH_SIZE rows (no fetchall() copy)
+
     # Load manufacturers
     print("  Loading manufacturers...")
     cursor.execute("SELECT id, name FROM manufacturers ORDER BY id")
-    manufacturers = {row['id']: row['name'] for row in cursor.fetchall()}
+    manufacturers = dict(cursor)
     print(f"    {len(manufacturers)} manufacturers")
 
     # Load ROM names
     print("  Loading ROM names...")
     cursor.execute("SELECT id, name FROM rom_names ORDER BY id")
-    rom_names = {row['id']: row['name'] for row in cursor.fetchall()}
+    rom_names = dict(cursor)
     print(f"    {len(rom_names)} ROM names")
 
-    # Load ROMs (filtered by size and require valid SHA1)
+    # Load ROMs (filtered by size and require valid SHA1). The predicate matches
+    # the partial index idx_roms_valid, which serves this query in order.
     print(f"  Loading ROMs (size: 2^{min_size_pow2} to 2^{max_size_pow2} bytes)...")
     cursor.execute("""
-        SELECT id, sha1, size_pow2, name_id
+        SELECT id, sha1, size_pow2, IFNULL(name_id, 0)
         FROM roms
         WHERE size_pow2 >= ? AND size_pow2 <= ?
         AND sha1 IS NOT NULL AND length(sha1) = 20
         ORDER BY size_pow2, sha1
     """, (min_size_pow2, max_size_pow2))
-
-    roms = []
-    for row in cursor.fetchall():
-        roms.append({
-            'old_id': row['id'],
-            'sha1': row['sha1'],
-            'size_pow2': row['size_pow2'],
-            'name_id': row['name_id'],
-        })
+    roms = fetch_array(cursor, ROM_DTYPE)
     print(f"    {len(roms)} ROMs")
 
     # Load machines
     print("  Loading machines...")
     cursor.execute("""
-        SELECT id, name, cloneof_id, romof_id, description, year, manufacturer_id
+        SELECT id, IFNULL(cloneof_id, 0), IFNULL(romof_id, 0), IFNULL(year, 0), IFNULL(manufacturer_id, 0)
         FROM machines
         ORDER BY id
     """)
-    machines = {}
-    for row in cursor.fetchall():
-        machines[row['id']] = {
-            'name': row['name'],
-            'cloneof_id': row['cloneof_id'],
-            'romof_id': row['romof_id'],
-            'description': row['description'],
-            'year': row['year'] if row['year'] else 0,
-            'manufacturer_id': row['manufacturer_id'],
-        }
+    machines = fetch_array(cursor, MACHINE_DTYPE)
+
+    # Strings and blobs stay Python objects, in the same (id) order
+    machine_names = []
+    machine_descriptions = []
+    cursor.execute("SELECT name, description FROM machines ORDER BY id")
+    for name, description in cursor:
+        machine_names.append(name)
+        machine_descriptions.append(description)
     print(f"    {len(machines)} machines")
 
-    # Load machine_roms (only for filtered ROMs)
+    # Load machine_roms (only for filtered ROMs, same predicate as above).
+    # CROSS JOIN keeps machine_roms as the outer loop: it is scanned in rom_id
+    # order, instead of probing it once per ROM from idx_roms_valid.
     print("  Loading machine-ROM mappings...")
-    rom_old_ids = {r['old_id'] for r in roms}
     cursor.execute("""
-        SELECT machine_id, rom_id, name_id
-        FROM machine_roms
-        ORDER BY rom_id, machine_id
-    """)
+        SELECT mr.machine_id, mr.rom_id, IFNULL(mr.name_id, 0)
+        FROM machine_roms mr
+        CROSS JOIN roms r ON r.id = mr.rom_id
+        WHERE r.size_pow2 >= ? AND r.size_pow2 <= ?
+        AND r.sha1 IS NOT NULL AND length(r.sha1) = 20
+        ORDER BY mr.rom_id, mr.machine_id
+    """, (min_size_pow2, max_size_pow2))
 
-    machine_roms = []
-    for row in cursor.fetchall():
-        if row['rom_id'] in rom_old_ids:
-            machine_roms.append({
-                'machine_id': row['machine_id'],
-                'rom_id': row['rom_id'],
-                'name_id': row['name_id'],
-            })
+    machine_roms = fetch_array(cursor, MACHINE_ROM_DTYPE)
     print(f"    {len(machine_roms)} mappings")
 
+    # Shared description dictionary (databases built before it existed have none)
+    description_dict = b''
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='metadata'")
+    if cursor.fetchone():
+        cursor.execute("SELECT description_dict FROM metadata WHERE id = 1")
+        row = cursor.fetchone()
+        if row and row[0]:
+            description_dict = row[0]
+
     conn.close()
 
     return {
@@ -176,7 +350,10 @@ def load_database(db_path, min_size_pow2, max_size_pow2):
         'rom_names': rom_names,
         'roms': roms,
         'machines': machines,
+        'machine_names': machine_names,
+        'machine_descriptions': machine_descriptions,
         'machine_roms': machine_roms,
+        'description_dict': description_dict,
     }
 
 
@@ -188,34 +365,51 @@ def remap_ids(data, min_size_pow2, max_size_pow2):
     """
     Remap all IDs to new compact values.
 
-    ROM IDs: size_pow2 in high 8 bits, sorted index in low 16 bits.
+    ROM IDs: size_pow2 in high 8 bits, index in low 16 bits. Each size is
+    stored in the slot order of a perfect hash of the SHA1s (build_rom_hash)
+    and the index is the slot.
     Other IDs: sequential starting from 0.
     """
     print("Remapping IDs...")
 
-    # Build ROM ID mapping (old_id -> new_id)
-    # Group ROMs by size, then assign sequential indices
-    roms_by_size = defaultdict(list)
-    for rom in data['roms']:
-        roms_by_size[rom['size_pow2']].append(rom)
-
-    rom_id_map = {}  # old_id -> new_id
-    size_index = {}  # size_pow2 -> (start_index, count)
-
-    global_index = 0
-    for size_pow2 in range(min_size_pow2, max_size_pow2 + 1):
-        roms_list = roms_by_size.get(size_pow2, [])
-        # Already sorted by SHA1 from SQL query
-
-        size_index[size_pow2] = (global_index, len(roms_list))
+    roms = data['roms']
+    machines = data['machines']
+    machine_roms = data['machine_roms']
 
-        for idx, rom in enumerate(roms_list):
-            new_id = make_rom_id(size_pow2, idx)
-            rom_id_map[rom['old_id']] = new_id
-            rom['new_id'] = new_id
-            global_index += 1
+    # Build ROM ID mapping (old_id -> new_id)
+    # ROMs come sorted by size, then SHA1, from the SQL query: each size is a
+    # contiguous run, rearranged in the slot order of a minimal perfect hash
+    # over its SHA1s so that the C lookup reads a single entry
+    sizes = roms['size_pow2']
+    counts = np.bincount(sizes, minlength=max_size_pow2 + 1)
+    starts = np.cumsum(counts) - counts
+
+    too_many = np.flatnonzero(counts > 0x10000)
+    if len(too_many):
+        size_pow2 = int(too_many[0])
+        raise ValueError(f"ROM index {int(counts[size_pow2]) - 1} exceeds 16-bit limit for size_pow2={size_pow2}")
+
+    permutation = np.arange(len(roms))
+    rom_hash = {}
+    for size_pow2 in np.flatnonzero(counts).tolist():
+        start, count = int(starts[size_pow2]), int(counts[size_pow2])
+        slots, pilots, remap = build_rom_hash(roms['sha1'][start:start + count])
+        permutation[start + slots] = np.arange(start, start + count)
+        rom_hash[size_pow2] = (pilots, remap)
+    roms = roms[permutation]
+
+    # The index is the position within the size run
+    indices = np.arange(len(roms)) - starts[sizes]
+    rom_new_ids = (sizes.astype(np.uint32) << 16) | indices.astype(np.uint32)
+
+    # size_pow2 -> (start_index, count)
+    size_index = {
+        size_pow2: (int(starts[size_pow2]), int(counts[size_pow2]))
+        for size_pow2 in range(min_size_pow2, max_size_pow2 + 1)
+    }
 
-    print(f"  ROM ID mapping: {len(rom_id_map)} entries")
+    rom_lut = build_lut(roms['old_id'], rom_new_ids, NULL_ID_24)
+    print(f"  ROM ID mapping: {len(roms)} entries")
     for size_pow2 in range(min_size_pow2, max_size_pow2 + 1):
         start, count = size_index.get(size_pow2, (0, 0))
         if count > 0:
@@ -227,94 +421,75 @@ def remap_ids(data, min_size_pow2, max_size_pow2):
             print(f"    size_pow2={size_pow2} ({size_str}): {count} ROMs")
 
     # Filter machines that have at least one ROM
-    machines_with_roms = set()
-    for mr in data['machine_roms']:
-        machines_with_roms.add(mr['machine_id'])
-
-    # Build machine ID mapping
-    machine_id_map = {}  # old_id -> new_id
-    new_machines = {}
-    new_id = 0
-    for old_id in sorted(data['machines'].keys()):
-        if old_id in machines_with_roms:
-            machine_id_map[old_id] = new_id
-            new_machines[new_id] = data['machines'][old_id]
-            new_machines[new_id]['old_id'] = old_id
-            new_id += 1
-
-    print(f"  Machine ID mapping: {len(machine_id_map)} entries (filtered from {len(data['machines'])})")
+    has_roms = np.isin(machines['old_id'], machine_roms['machine_id'])
 
-    # Build manufacturer ID mapping (only used manufacturers)
-    used_manufacturers = set()
-    for m in new_machines.values():
-        if m['manufacturer_id'] is not None:
-            used_manufacturers.add(m['manufacturer_id'])
+    # Build machine ID mapping (new IDs follow the old ID order)
+    kept = np.flatnonzero(has_roms).tolist()
+
+    new_machines = machines[kept]
+    machine_names = [data['machine_names'][i] for i in kept]
+    machine_descriptions = [data['machine_descriptions'][i] for i in kept]
+    machine_lut = build_lut(new_machines['old_id'], np.arange(len(new_machines)), NULL_ID_16)
 
-    manufacturer_id_map = {}  # old_id -> new_id
-    new_manufacturers = {}
-    new_id = 0
-    for old_id in sorted(used_manufacturers):
-        manufacturer_id_map[old_id] = new_id
-        new_manufacturers[new_id] = data['manufacturers'].get(old_id, "Unknown")
-        new_id += 1
+    print(f"  Machine ID mapping: {len(new_machines)} entries (filtered from {len(machines)})")
+
+    # Build manufacturer ID mapping (only used manufacturers)
+    used_manufacturers = np.unique(new_machines['manufacturer_id'])
+    used_manufacturers = used_manufacturers[used_manufacturers != 0]
+    manufacturer_lut = build_lut(used_manufacturers, np.arange(len(used_manufacturers)), NULL_ID_16)
+    new_manufacturers = {
+        new_id: data['manufacturers'].get(old_id, "Unknown")
+        for new_id, old_id in enumerate(used_manufacturers.tolist())
+    }
 
-    print(f"  Manufacturer ID mapping: {len(manufacturer_id_map)} entries")
+    print(f"  Manufacturer ID mapping: {len(new_manufacturers)} entries")
 
     # Build ROM name ID mapping (only used names)
-    used_rom_names = set()
-    for rom in data['roms']:
-        if rom['name_id'] is not None:
-            used_rom_names.add(rom['name_id'])
-    for mr in data['machine_roms']:
-        if mr['name_id'] is not None:
-            used_rom_names.add(mr['name_id'])
-
-    rom_name_id_map = {}  # old_id -> new_id
-    new_rom_names = {}
-    new_id = 0
-    for old_id in sorted(used_rom_names):
-        rom_name_id_map[old_id] = new_id
-        new_rom_names[new_id] = data['rom_names'].get(old_id, "")
-        new_id += 1
-
-    print(f"  ROM name ID mapping: {len(rom_name_id_map)} entries")
-
-    # Update references in machine_roms
-    new_machine_roms = []
-    for mr in data['machine_roms']:
-        if mr['machine_id'] in machine_id_map and mr['rom_id'] in rom_id_map:
-            new_machine_roms.append({
-                'machine_id': machine_id_map[mr['machine_id']],
-                'rom_id': rom_id_map[mr['rom_id']],
-                'name_id': rom_name_id_map.get(mr['name_id'], NULL_ID_24) if mr['name_id'] else NULL_ID_24,
-            })
-
-    # Sort by rom_id for efficient lookup
-    new_machine_roms.sort(key=lambda x: (x['rom_id'], x['machine_id']))
+    used_rom_names = np.unique(np.concatenate([roms['name_id'], machine_roms['name_id']]))
+    used_rom_names = used_rom_names[used_rom_names != 0]
+    rom_name_lut = build_lut(used_rom_names, np.arange(len(used_rom_names)), NULL_ID_24)
+    new_rom_names = {
+        new_id: data['rom_names'].get(old_id, "")
+        for new_id, old_id in enumerate(used_rom_names.tolist())
+    }
+
+    print(f"  ROM name ID mapping: {len(new_rom_names)} entries")
+
+    # Update references in machine_roms (vectorized lookups, drop unmapped rows)
+    mr_rom_ids = lookup_ids(rom_lut, machine_roms['rom_id'], NULL_ID_24)
+    mr_machine_ids = lookup_ids(machine_lut, machine_roms['machine_id'], NULL_ID_16)
+    mr_name_ids = lookup_ids(rom_name_lut, machine_roms['name_id'], NULL_ID_24)
+    keep = (mr_rom_ids != NULL_ID_24) & (mr_machine_ids != NULL_ID_16)
+
+    new_machine_roms = np.empty(np.count_nonzero(keep), dtype=MACHINE_ROM_DTYPE)
+    new_machine_roms['machine_id'] = mr_machine_ids[keep]
+    new_machine_roms['rom_id'] = mr_rom_ids[keep]
+    new_machine_roms['name_id'] = mr_name_ids[keep]
+
+    # Sort by rom_id for efficient lookup (stable, like the SQL order for ties)
+    new_machine_roms = new_machine_roms[np.lexsort((new_machine_roms['machine_id'],
+                                                    new_machine_roms['rom_id']))]
     print(f"  Machine-ROM mappings: {len(new_machine_roms)} entries")
 
     # Update references in machines
-    for m in new_machines.values():
-        old_cloneof = m['cloneof_id']
-        old_romof = m['romof_id']
-        old_manuf = m['manufacturer_id']
-
-        m['cloneof_id'] = machine_id_map.get(old_cloneof, NULL_ID_16) if old_cloneof else NULL_ID_16
-        m['romof_id'] = machine_id_map.get(old_romof, NULL_ID_16) if old_romof else NULL_ID_16
-        m['manufacturer_id'] = manufacturer_id_map.get(old_manuf, NULL_ID_16) if old_manuf else NULL_ID_16
+    new_machines['cloneof_id'] = lookup_ids(machine_lut, new_machines['cloneof_id'], NULL_ID_16)
+    new_machines['romof_id'] = lookup_ids(machine_lut, new_machines['romof_id'], NULL_ID_16)
+    new_machines['manufacturer_id'] = lookup_ids(manufacturer_lut, new_machines['manufacturer_id'], NULL_ID_16)
 
     # Update references in roms
-    for rom in data['roms']:
-        rom['name_id'] = rom_name_id_map.get(rom['name_id'], NULL_ID_24) if rom['name_id'] else NULL_ID_24
+    roms['name_id'] = lookup_ids(rom_name_lut, roms['name_id'], NULL_ID_24)
 
     return {
-        'roms': data['roms'],  # Already has new_id
+        'roms': roms,
         'machines': new_machines,
+        'machine_names': machine_names,
+        'machine_descriptions': machine_descriptions,
         'machine_roms': new_machine_roms,
         'manufacturers': new_manufacturers,
         'rom_names': new_rom_names,
         'size_index': size_index,
-        'rom_id_map': rom_id_map,
+        'rom_hash': rom_hash,
+        'description_dict': data['description_dict'],
     }
 
 
@@ -323,72 +498,159 @@ def remap_ids(data, min_size_pow2, max_size_pow2):
 # ============================================================================
 
 def build_strings_pool(data):
-    """Build the strings pool and return (pool_bytes, offset_map)."""
+    """Build the strings pool and return (pool_bytearray, string_offsets).
+
+    string_offsets maps 'manufacturers', 'rom_names' and 'machines' to
+    uint32 arrays of pool offsets, indexed by new ID.
+    """
     print("Building strings pool...")
 
-    strings = set()
+    pool = bytearray()
+    offset_map = {}
 
-    # Collect all strings
-    for name in data['manufacturers'].values():
-        strings.add(name)
+    def intern(s):
+        offset = offset_map.get(s)
+        if offset is None:
+            encoded = s.encode('utf-8')
+            pool.append(min(len(encoded), STRING_LENGTH_MAX))  # Length prefix
+            offset = offset_map[s] = len(pool)
+            pool.extend(encoded)
+            pool.append(0)  # Null terminator
+        return offset
+
+    def intern_all(names, count):
+        return np.fromiter((intern(name) for name in names), dtype='<u4', count=count)
+
+    # Add each unique string once, in ID order (deterministic output)
+    string_offsets = {
+        'manufacturers': intern_all(data['manufacturers'].values(), len(data['manufacturers'])),
+        'rom_names': intern_all(data['rom_names'].values(), len(data['rom_names'])),
+        # Descriptions are stored compressed separately
+        'machines': intern_all(data['machine_names'], len(data['machine_names'])),
+    }
 
-    for name in data['rom_names'].values():
-        strings.add(name)
+    print(f"  {len(offset_map)} unique strings, {len(pool)} bytes")
 
-    for m in data['machines'].values():
-        strings.add(m['name'])
-        # Description is stored compressed separately
+    # Returned as is: the pool is copied once, into the output mapping
+    return pool, string_offsets
 
-    # Sort for deterministic output
-    strings = sorted(strings)
 
-    # Build pool
-    pool = bytearray()
-    offset_map = {}
+def compress_strings_pool(pool):
+    """Compress the strings pool as its size (uint32) and a raw deflate stream."""
+    stream = zlib.compressobj(STRINGS_DEFLATE_LEVEL, zlib.DEFLATED, -15)
+    compressed = struct.pack('<I', len(pool)) + stream.compress(pool) + stream.flush()
 
-    for s in strings:
-        offset_map[s] = len(pool)
-        pool.extend(s.encode('utf-8'))
-        pool.append(0)  # Null terminator
+    print(f"  Strings pool compressed: {len(pool)} -> {len(compressed)} bytes")
 
-    print(f"  {len(strings)} unique strings, {len(pool)} bytes")
+    return compressed
 
-    return bytes(pool), offset_map
+
+def description_text(blob, zdict):
+    """Return a database description as UTF-8 bytes.
+
+    The database stores descriptions as raw UTF-8 or zlib compressed, with
+    the shared dictionary when the FDICT header bit is set.
+    """
+    if not blob:
+        return b''
+    if is_zlib_header(blob):
+        stream = zlib.decompressobj(zdict=zdict) if blob[1] & 0x20 else zlib.decompressobj()
+        blob = stream.decompress(blob) + stream.flush()
+    return blob
+
+
+def deflate_description(text, zdict):
+    """Compress a description as a raw deflate stream primed with zdict."""
+    if not text:
+        return b''
+    stream = zlib.compressobj(DESC_DEFLATE_LEVEL, zlib.DEFLATED, -15, zdict=zdict)
+    return stream.compress(text) + stream.flush()
 
 
 def build_descriptions_pool(data):
-    """Build compressed descriptions pool."""
+    """Build compressed descriptions pool.
+
+    The pool starts with a preset dictionary trained on the descriptions,
+    followed by each description as a raw deflate stream primed with it.
+    Returns (pool_bytes, desc_info).
+    """
     print("Building descriptions pool...")
 
-    pool = bytearray()
-    desc_info = {}  # machine_new_id -> (offset, length)
-
-    for new_id, m in sorted(data['machines'].items()):
-        if m['description']:
-            # Description is already zlib compressed in database
-            desc_data = m['description']
-            desc_info[new_id] = (len(pool), len(desc_data))
-            pool.extend(desc_data)
-        else:
-            desc_info[new_id] = (0, 0)
+    descriptions = data['machine_descriptions']
+
+    processes = os.cpu_count() or 1
+    if processes > 1 and len(descriptions) > DESC_CHUNK_SIZE:
+        # Each description is decoded and compressed independently: spread
+        # the work over worker processes (map keeps the machine order)
+        with multiprocessing.Pool(processes) as pool:
+            texts = pool.map(partial(description_text, zdict=data['description_dict']),
+                             descriptions, chunksize=DESC_CHUNK_SIZE)
+            zdict = build_desc_dict(text.decode('utf-8') for text in texts)[-DESC_DICT_SIZE:]
+            blobs = pool.map(partial(deflate_description, zdict=zdict),
+                             texts, chunksize=DESC_CHUNK_SIZE)
+    else:
+        texts = [description_text(description, data['description_dict']) for description in descriptions]
+        zdict = build_desc_dict(text.decode('utf-8') for text in texts)[-DESC_DICT_SIZE:]
+        blobs = [deflate_description(text, zdict) for text in texts]
+
+    # desc_info: offsets/lengths columns indexed by machine new_id (offsets
+    # are relative to the pool, machines without a description get (0, 0)),
+    # plus the dictionary size and the longest decompressed description
+    lengths = np.array([len(blob) for blob in blobs], dtype=np.int64)
+    offsets = np.where(lengths > 0, len(zdict) + np.cumsum(lengths) - lengths, 0)
+    pool = b''.join([zdict, *blobs])
+    desc_info = {
+        'offsets': offsets,
+        'lengths': lengths,
+        'dict_size': len(zdict),
+        'max_length': max((len(text) for text in texts), default=0),
+    }
 
-    print(f"  {len([d for d in desc_info.values() if d[1] > 0])} descriptions, {len(pool)} bytes")
+    print(f"  {np.count_nonzero(lengths)} descriptions, {len(pool)} bytes "
+          f"(dictionary: {len(zdict)} bytes)")
 
-    return bytes(pool), desc_info
+    return pool, desc_info
 
 
 def generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
-                    min_size_pow2, max_size_pow2):
-    """Generate the complete binary file."""
+                    output_path, min_size_pow2, max_size_pow2, compress_strings=False):
+    """Write the complete binary file and return its size.
+
+    The file is sized up front and every section is written in place
+    through a memory map, so the binary is never assembled in memory. It
+    is built next to output_path, which is only replaced if it changed.
+    With compress_strings, the strings pool is stored deflated and must be
+    inflated at startup (mrdb_init).
+    """
     print("Generating binary data...")
 
+    machines = data['machines']
+    machine_roms = data['machine_roms']
+    desc_offsets = desc_info['offsets']
+    desc_lengths = desc_info['lengths']
+
     # Validate 16-bit limits for machine IDs
-    if len(data['machines']) > 0xFFFF:
-        raise ValueError(f"Machine count {len(data['machines'])} exceeds 16-bit limit (65535)")
+    if len(machines) > 0xFFFF:
+        raise ValueError(f"Machine count {len(machines)} exceeds 16-bit limit (65535)")
+
+    too_long = np.flatnonzero(desc_lengths > 255)
+    if len(too_long):
+        new_id = int(too_long[0])
+        raise ValueError(f"Machine {new_id} ({data['machine_names'][new_id]}): "
+                         f"desc_length {desc_lengths[new_id]} exceeds 8-bit limit (255)")
+    if len(desc_pool) > 1 << 24:
+        raise ValueError(f"Descriptions pool size {len(desc_pool)} exceeds 24-bit offsets (16 MB)")
+    for field in ('cloneof_id', 'romof_id'):
+        if len(machines) and machines[field].max() > 0xFFFF:
+            new_id = int(np.argmax(machines[field]))
+            raise ValueError(f"Machine {new_id}: {field} {machines[field][new_id]} exceeds 16-bit limit")
+    if len(machine_roms) and machine_roms['machine_id'].max() > 0xFFFF:
+        raise ValueError(f"machine_id {machine_roms['machine_id'].max()} exceeds 16-bit limit in machine_roms")
 
     # Calculate sizes
     num_sizes = max_size_pow2 - min_size_pow2 + 1
-    size_index_size = num_sizes * 8  # 4 bytes start_offset + 4 bytes end_offset per size
+    # start_index(4) + count(4) + hash_offset(4) + bucket_count(2) + remap_count(2) per size
+    size_index_size = num_sizes * 16
 
     roms_count = len(data['roms'])
     machines_count = len(data['machines'])
@@ -396,32 +658,50 @@ def generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
     manufacturers_count = len(data['manufacturers'])
     rom_names_count = len(data['rom_names'])
 
-    # ROM entry: sha1(20) + name_id(3) = 23 bytes
+    # ROMs: sha1(20) array, then name_id(3) array = 23 bytes per ROM
     roms_size = roms_count * 23
 
-    # Machine entry: name_offset(4) + desc_offset(4) + desc_len(1) +
-    #                cloneof_id(2) + romof_id(2) + year(2) + manufacturer_id(2) = 17 bytes
-    machines_size = machines_count * 17
-
-    # Machine-ROM entry: machine_id(2) + rom_id(3) + name_id(3) = 8 bytes
-    machine_roms_size = machine_roms_count * 8
-
-    # Manufacturer entry: name_offset(4) = 4 bytes
-    manufacturers_size = manufacturers_count * 4
-
-    # ROM name entry: name_offset(4) = 4 bytes
-    rom_names_size = rom_names_count * 4
+    # ROM perfect hashes: pilots(2) per bucket, then remap(2) per table position past the count
+    sizes = range(min_size_pow2, max_size_pow2 + 1)
+    empty_hash = (np.zeros(0, dtype='<u2'), np.zeros(0, dtype='<u2'))
+    hashes = [data['rom_hash'].get(size_pow2, empty_hash) for size_pow2 in sizes]
+    hash_sizes = np.array([2 * (len(pilots) + len(remap)) for pilots, remap in hashes], dtype=np.int64)
+    roms_size += int(hash_sizes.sum())
+
+    # Machine entry (4-byte aligned): name_offset(4) + desc_offset(3) + desc_len(1) +
+    #                cloneof_id(2) + romof_id(2) + year(2) + manufacturer_id(2) = 16 bytes
+    machines_size = machines_count * 16
+
+    # Machine-ROMs (4-byte aligned): first mapping of each ROM, plus the end,
+    # as rom_starts(4) per ROM + 4, then machine_id(2) + name_id(3) columns
+    machine_roms_size = (roms_count + 1) * 4 + machine_roms_count * 5
+
+    # Manufacturer / ROM name entry: name_offset(3), or name_offset(4) if the
+    # strings pool does not fit in 24-bit offsets
+    flags = 0
+    name_offset_size = 4
+    if len(strings_pool) <= 1 << 24:
+        flags |= FLAG_NAME_OFFSET_24
+        name_offset_size = 3
+    manufacturers_size = manufacturers_count * name_offset_size
+    rom_names_size = rom_names_count * name_offset_size
+
+    # Strings pool, as stored (offsets still refer to the inflated pool)
+    if compress_strings:
+        flags |= FLAG_STRINGS_DEFLATE
+        strings_pool = compress_strings_pool(strings_pool)
 
     # Calculate offsets
     size_index_offset = HEADER_SIZE
     roms_offset = size_index_offset + size_index_size
-    machines_offset = roms_offset + roms_size
+    machines_offset = (roms_offset + roms_size + 3) & ~3
     machine_roms_offset = machines_offset + machines_size
     manufacturers_offset = machine_roms_offset + machine_roms_size
     rom_names_offset = manufacturers_offset + manufacturers_size
     strings_offset = rom_names_offset + rom_names_size
     desc_offset = strings_offset + len(strings_pool)
-    total_size = desc_offset + len(desc_pool)
+    # One padding byte: 24-bit values may be read with a 4-byte load
+    total_size = desc_offset + len(desc_pool) + 1
 
     print(f"  Header: {HEADER_SIZE} bytes")
     print(f"  Size index: {size_index_size} bytes")
@@ -434,12 +714,9 @@ def generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
     print(f"  Descriptions pool: {len(desc_pool)} bytes")
     print(f"  Total: {total_size} bytes ({total_size / 1024 / 1024:.2f} MB)")
 
-    # Build binary
-    output = bytearray()
-
     # Header
     header = struct.pack(
-        '<4sHBB IIIII IIIIIIII',
+        '<4sHBB IIIII IIIIIIII BxH',
         MAGIC,
         VERSION,
         min_size_pow2,
@@ -457,82 +734,97 @@ def generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
         rom_names_offset,
         strings_offset,
         desc_offset,
+        flags,
+        desc_info['dict_size'],
     )
-    output.extend(header)
-
-    # Pad header to HEADER_SIZE
-    output.extend(b'\x00' * (HEADER_SIZE - len(header)))
 
-    # Size index table (byte offsets relative to roms_offset)
-    ROM_ENTRY_SIZE = 23  # sha1(20) + name_id(3)
-    for size_pow2 in range(min_size_pow2, max_size_pow2 + 1):
-        start_idx, count = data['size_index'].get(size_pow2, (0, 0))
-        start_offset = start_idx * ROM_ENTRY_SIZE
-        end_offset = (start_idx + count) * ROM_ENTRY_SIZE
-        output.extend(struct.pack('<I', start_offset))
-        output.extend(struct.pack('<I', end_offset))
-
-    # ROMs table (sorted by size_pow2, then SHA1)
-    for rom in data['roms']:
-        sha1 = rom['sha1'] if rom['sha1'] else b'\x00' * 20
-        output.extend(sha1)
-        output.extend(write_uint24(rom['name_id']))
-
-    # Machines table
-    for new_id in range(machines_count):
-        m = data['machines'][new_id]
-        name_off = string_offsets.get(m['name'], 0)
-        d_off, d_len = desc_info.get(new_id, (0, 0))
-
-        if d_len > 255:
-            raise ValueError(f"Machine {new_id} ({m['name']}): desc_length {d_len} exceeds 8-bit limit (255)")
-        if m['cloneof_id'] != NULL_ID_16 and m['cloneof_id'] > 0xFFFF:
-            raise ValueError(f"Machine {new_id}: cloneof_id {m['cloneof_id']} exceeds 16-bit limit")
-        if m['romof_id'] != NULL_ID_16 and m['romof_id'] > 0xFFFF:
-            raise ValueError(f"Machine {new_id}: romof_id {m['romof_id']} exceeds 16-bit limit")
-
-        output.extend(struct.pack('<I', name_off))
-        output.extend(struct.pack('<I', d_off))
-        output.extend(struct.pack('<B', d_len))
-        output.extend(struct.pack('<H', m['cloneof_id'] & 0xFFFF))
-        output.extend(struct.pack('<H', m['romof_id'] & 0xFFFF))
-        output.extend(struct.pack('<H', m['year'] & 0xFFFF))
-        output.extend(struct.pack('<H', m['manufacturer_id'] & 0xFFFF))
-
-    # Machine-ROMs table (sorted by rom_id)
-    for mr in data['machine_roms']:
-        if mr['machine_id'] > 0xFFFF:
-            raise ValueError(f"machine_id {mr['machine_id']} exceeds 16-bit limit in machine_roms")
-        output.extend(struct.pack('<H', mr['machine_id'] & 0xFFFF))
-        output.extend(write_uint24(mr['rom_id']))
-        output.extend(write_uint24(mr['name_id']))
-
-    # Manufacturers table
-    for new_id in range(manufacturers_count):
-        name = data['manufacturers'][new_id]
-        name_off = string_offsets.get(name, 0)
-        output.extend(struct.pack('<I', name_off))
-
-    # ROM names table
-    for new_id in range(rom_names_count):
-        name = data['rom_names'][new_id]
-        name_off = string_offsets.get(name, 0)
-        output.extend(struct.pack('<I', name_off))
-
-    # Strings pool
-    output.extend(strings_pool)
-
-    # Descriptions pool
-    output.extend(desc_pool)
-
-    return bytes(output)
+    # Size index table (index of the first ROM and ROM count of each size,
+    # byte offset to the perfect hash tables relative to roms_offset). ROMs
+    # are grouped by ascending size, so an empty size starts where the next
+    # one does.
+    ROM_ENTRY_SIZE = 20  # sha1(20)
+    counts = np.array([data['size_index'].get(size_pow2, (0, 0))[1] for size_pow2 in sizes], dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    hash_offsets = roms_count * 23 + np.cumsum(hash_sizes) - hash_sizes
+    size_entries = np.zeros(num_sizes, dtype=SIZE_INDEX_RECORD)
+    size_entries['start_index'] = starts
+    size_entries['count'] = counts
+    size_entries['hash_offset'] = hash_offsets
+    size_entries['bucket_count'] = [len(pilots) for pilots, _ in hashes]
+    size_entries['remap_count'] = [len(remap) for _, remap in hashes]
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w+b') as f:
+        f.truncate(total_size)
+        with mmap.mmap(f.fileno(), total_size) as mm:
+            # Header, padded to HEADER_SIZE (the new file is zero-filled)
+            mm[:len(header)] = header
+            mm[size_index_offset:roms_offset] = size_entries.tobytes()
+
+            # Record tables are filled through NumPy views of the mapping
+            # ROMs table (by size_pow2, then SHA1 perfect hash slot): all
+            # SHA1s, then the ROM name IDs in the same order
+            roms = data['roms']
+            rom_name_ids_offset = roms_offset + roms_count * ROM_ENTRY_SIZE
+            rom_records = np.frombuffer(mm, 'S20', roms_count, roms_offset)
+            rom_records[:] = roms['sha1']
+            mm[rom_name_ids_offset:roms_offset + hash_offsets[0]] = pack_uint24(roms['name_id']).tobytes()
+
+            # ROM perfect hash tables, one per size
+            mm[roms_offset + hash_offsets[0]:roms_offset + roms_size] = b''.join(
+                pilots.tobytes() + remap.tobytes() for pilots, remap in hashes)
+
+            # Machines table
+            machine_records = np.frombuffer(mm, MACHINE_RECORD, machines_count, machines_offset)
+            machine_records['name_offset'] = string_offsets['machines']
+            machine_records['desc'] = desc_offsets | (desc_lengths << 24)
+            machine_records['cloneof_id'] = machines['cloneof_id']
+            machine_records['romof_id'] = machines['romof_id']
+            machine_records['year'] = machines['year'] & 0xFFFF
+            machine_records['manufacturer_id'] = machines['manufacturer_id']
+
+            # Machine-ROMs table: rom_starts, then the machine_id and name_id
+            # columns. Mappings are sorted by rom_id, which follows the ROMs
+            # table order: each ROM's mappings start at the number of mappings
+            # of the ROMs before it (CSR row pointers)
+            rom_positions = starts[(machine_roms['rom_id'] >> 16) - min_size_pow2] + (machine_roms['rom_id'] & 0xFFFF)
+            rom_starts = np.searchsorted(rom_positions, np.arange(roms_count + 1))
+            mr_machine_ids_offset = machine_roms_offset + (roms_count + 1) * 4
+            mr_name_ids_offset = mr_machine_ids_offset + machine_roms_count * 2
+            mm[machine_roms_offset:mr_machine_ids_offset] = rom_starts.astype('<u4').tobytes()
+            mm[mr_machine_ids_offset:mr_name_ids_offset] = machine_roms['machine_id'].astype('<u2').tobytes()
+            mm[mr_name_ids_offset:manufacturers_offset] = pack_uint24(machine_roms['name_id']).tobytes()
+
+            # Views must be released before the mapping is closed
+            del rom_records, machine_records
+
+            def name_table(offsets):
+                if name_offset_size == 3:
+                    return pack_uint24(offsets).tobytes()
+                return offsets.tobytes()
+
+            # Manufacturers table
+            mm[manufacturers_offset:rom_names_offset] = name_table(string_offsets['manufacturers'])
+
+            # ROM names table
+            mm[rom_names_offset:strings_offset] = name_table(string_offsets['rom_names'])
+
+            # Strings pool
+            mm[strings_offset:desc_offset] = strings_pool
+
+            # Descriptions pool
+            mm[desc_offset:total_size - 1] = desc_pool
+
+    replace_if_changed(tmp_path, output_path)
+
+    return total_size
 
 
 # ============================================================================
 # C header generation
 # ============================================================================
 
-def generate_header(data, binary_data, output_path, min_size_pow2, max_size_pow2):
+def generate_header(data, total_size, desc_info, output_path, min_size_pow2, max_size_pow2):
     """Generate C header file with structure definitions."""
     print(f"Generating C header: {output_path}")
 
@@ -543,7 +835,9 @@ def generate_header(data, binary_data, output_path, min_size_pow2, max_size_pow2
 #ifndef MAME_ROM_DATABASE_H
 #define MAME_ROM_DATABASE_H
 
+#include <stddef.h>
 #include <stdint.h>
+#include <string.h>
 
 #ifdef __cplusplus
 extern "C" {{
@@ -562,6 +856,10 @@ extern "C" {{
 #define MRDB_NULL_ID_24     0xFFFFFF
 #define MRDB_NULL_ID_16     0xFFFF
 
+// Header flags
+#define MRDB_FLAG_NAME_OFFSET_24 0x01  // Manufacturers/ROM names entries are 3-byte offsets
+#define MRDB_FLAG_STRINGS_DEFLATE 0x02 // Strings pool is deflated: call mrdb_init before use
+
 // ============================================================================
 // Database statistics
 // ============================================================================
@@ -571,14 +869,16 @@ extern "C" {{
 #define MRDB_MACHINE_ROMS_COUNT {len(data['machine_roms'])}
 #define MRDB_MANUFACTURERS_COUNT {len(data['manufacturers'])}
 #define MRDB_ROM_NAMES_COUNT    {len(data['rom_names'])}
-#define MRDB_TOTAL_SIZE         {len(binary_data)}
+#define MRDB_TOTAL_SIZE         {total_size}
+#define MRDB_DESC_DICT_SIZE     {desc_info['dict_size']}
+#define MRDB_DESC_MAX_LENGTH    {desc_info['max_length']}
 
 // ============================================================================
 // Data structures
 // ============================================================================
 
-// Header structure (64 bytes)
-typedef struct __attribute__((packed)) {{
+// Header structure (64 bytes, naturally aligned: the database is 64-byte aligned)
+typedef struct {{
     uint32_t magic;
     uint16_t version;
     uint8_t min_size_pow2;
@@ -598,61 +898,83 @@ typedef struct __attribute__((packed)) {{
     uint32_t rom_names_offset;
     uint32_t strings_offset;
     uint32_t desc_offset;
+
+    uint8_t flags;            // MRDB_FLAG_* bits
+    uint8_t reserved;
+    uint16_t desc_dict_size;  // Preset dictionary at the start of the descriptions pool
 }} MrdbHeader;
 
-// Size index entry (8 bytes per size)
-// Stores byte offsets relative to roms_offset for direct pointer access
-typedef struct __attribute__((packed)) {{
-    uint32_t start_offset;    // Byte offset to first ROM of this size (relative to roms_offset)
-    uint32_t end_offset;      // Byte offset past last ROM of this size (relative to roms_offset)
+// Size index entry (16 bytes per size, naturally aligned)
+// Stores ROM indices into the ROMs table, so no lookup divides byte offsets
+typedef struct {{
+    uint32_t start_index;     // Index of the first ROM of this size in the ROMs table
+    uint32_t count;           // Number of ROMs of this size
+    uint32_t hash_offset;     // Byte offset to the perfect hash pilots (relative to roms_offset)
+    uint16_t bucket_count;    // Number of 16-bit pilots
+    uint16_t remap_count;     // Number of 16-bit slots for hash positions past the ROM count
 }} MrdbSizeIndex;
 
-// ROM entry (23 bytes)
-typedef struct __attribute__((packed)) {{
+#ifdef __cplusplus
+#define MRDB_STATIC_ASSERT(cond, msg) static_assert(cond, msg)
+#else
+#define MRDB_STATIC_ASSERT(cond, msg) _Static_assert(cond, msg)
+#endif
+
+MRDB_STATIC_ASSERT(sizeof(MrdbHeader) == 64, "MrdbHeader must be 64 bytes");
+MRDB_STATIC_ASSERT(offsetof(MrdbHeader, size_index_offset) % 4 == 0, "MrdbHeader offsets must be aligned");
+MRDB_STATIC_ASSERT(offsetof(MrdbHeader, desc_dict_size) == 0x3E, "MrdbHeader layout mismatch");
+MRDB_STATIC_ASSERT(sizeof(MrdbSizeIndex) == 16, "MrdbSizeIndex must be 16 bytes");
+
+// ROM entry (20 bytes), the ROMs table is the array of all SHA1s followed
+// by a parallel array of 24-bit ROM name IDs (see mrdb_get_rom_name_id)
+typedef struct {{
     uint8_t sha1[20];
-    uint8_t name_id[3];       // 24-bit ID into rom_names table
 }} MrdbRom;
 
-// Machine entry (17 bytes)
-typedef struct __attribute__((packed)) {{
+// Machine entry (16 bytes, naturally aligned)
+typedef struct {{
     uint32_t name_offset;     // Offset into strings pool
-    uint32_t desc_offset;     // Offset into descriptions pool
-    uint8_t desc_length;      // Compressed description length
+    uint32_t desc;            // Descriptions pool offset | compressed length << 24 (see MRDB_DESC_*)
     uint16_t cloneof_id;      // 16-bit machine ID or 0xFFFF
     uint16_t romof_id;        // 16-bit machine ID or 0xFFFF
     uint16_t year;            // Release year (16-bit)
     uint16_t manufacturer_id; // 16-bit ID or 0xFFFF
 }} MrdbMachine;
 
-// Machine-ROM mapping entry (8 bytes)
-typedef struct __attribute__((packed)) {{
-    uint16_t machine_id;      // 16-bit machine ID
-    uint8_t rom_id[3];        // 24-bit ROM ID (size_pow2 << 16 | index)
-    uint8_t name_id[3];       // 24-bit ROM name ID in this machine
-}} MrdbMachineRom;
+MRDB_STATIC_ASSERT(sizeof(MrdbMachine) == 16, "MrdbMachine must be 16 bytes");
 
-// Manufacturer entry (4 bytes)
-typedef struct __attribute__((packed)) {{
-    uint32_t name_offset;     // Offset into strings pool
-}} MrdbManufacturer;
+// Description offset (bits 0-23) and compressed length (bits 24-31) of a machine
+#define MRDB_DESC_OFFSET(machine) ((machine)->desc & 0xFFFFFF)
+#define MRDB_DESC_LENGTH(machine) ((machine)->desc >> 24)
 
-// ROM name entry (4 bytes)
-typedef struct __attribute__((packed)) {{
-    uint32_t name_offset;     // Offset into strings pool
-}} MrdbRomName;
+// Machine-ROM mappings, sorted by ROM, stored as columns starting at
+// machine_roms_offset (see mrdb_get_mr_rom_starts):
+//   uint32_t rom_start[roms_count + 1]  First mapping of each ROM (ROMs table
+//                                       order), then machine_roms_count
+//   uint16_t machine_id[count]          16-bit machine ID
+//   uint8_t name_id[count][3]           24-bit ROM name ID in this machine
+
+// Manufacturer and ROM name entries: offset into strings pool, 3 bytes if
+// MRDB_FLAG_NAME_OFFSET_24 is set, 4 bytes otherwise (see mrdb_read_name_offset)
 
 // ============================================================================
 // Helper macros for 24-bit ID handling
 // ============================================================================
 
-#define MRDB_READ_UINT24(ptr) \\
-    ((uint32_t)(ptr)[0] | ((uint32_t)(ptr)[1] << 8) | ((uint32_t)(ptr)[2] << 16))
+// Read a little-endian 24-bit value. Where unaligned loads are cheap this is
+// a single 4-byte load: the database ends with a padding byte, so the load
+// never reads past it.
+static inline uint32_t mrdb_read_uint24(const uint8_t* ptr) {{
+#if defined(__x86_64__) || defined(__i386__) || defined(__aarch64__) || defined(__ARM_FEATURE_UNALIGNED)
+    uint32_t value;
+    memcpy(&value, ptr, 4);
+    return value & 0xFFFFFF;
+#else
+    return (uint32_t)ptr[0] | ((uint32_t)ptr[1] << 8) | ((uint32_t)ptr[2] << 16);
+#endif
+}}
 
-#define MRDB_WRITE_UINT24(ptr, val) do {{ \\
-    (ptr)[0] = (uint8_t)((val) & 0xFF); \\
-    (ptr)[1] = (uint8_t)(((val) >> 8) & 0xFF); \\
-    (ptr)[2] = (uint8_t)(((val) >> 16) & 0xFF); \\
-}} while(0)
+#define MRDB_READ_UINT24(ptr) mrdb_read_uint24((const uint8_t*)(ptr))
 
 // Extract size_pow2 from ROM ID
 #define MRDB_ROM_ID_SIZE_POW2(rom_id) (((rom_id) >> 16) & 0xFF)
@@ -670,6 +992,25 @@ typedef struct __attribute__((packed)) {{
 // Get pointer to embedded database
 const uint8_t* mrdb_get_data(void);
 
+/**
+ * Prepare the database for access.
+ *
+ * Only needed if the database was generated with --compress-strings
+ * (MRDB_FLAG_STRINGS_DEFLATE): the strings pool is then inflated once into
+ * buffer, which must stay valid and hold mrdb_get_strings_size(db) bytes.
+ * That is about 2.5 MB of RAM for a complete MAME database, more than the
+ * Pico 2 SRAM (use PSRAM), for about 1.7 MB of flash saved.
+ *
+ * @param db          Pointer to the database
+ * @param buffer      Strings pool buffer (unused without the flag)
+ * @param buffer_size Size of the buffer
+ * @return            1 on success, 0 if the buffer is too small or the pool is corrupt
+ */
+int mrdb_init(const uint8_t* db, uint8_t* buffer, uint32_t buffer_size);
+
+// Inflated strings pool, set by mrdb_init (compressed strings pool only)
+extern const char* mrdb_strings;
+
 // Get database header
 static inline const MrdbHeader* mrdb_get_header(const uint8_t* db) {{
     return (const MrdbHeader*)db;
@@ -693,30 +1034,73 @@ static inline const MrdbMachine* mrdb_get_machines(const uint8_t* db) {{
     return (const MrdbMachine*)(db + hdr->machines_offset);
 }}
 
-// Get machine-ROMs table
-static inline const MrdbMachineRom* mrdb_get_machine_roms(const uint8_t* db) {{
+// Get machine-ROMs first mapping index of each ROM
+static inline const uint32_t* mrdb_get_mr_rom_starts(const uint8_t* db) {{
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    return (const uint32_t*)(db + hdr->machine_roms_offset);
+}}
+
+// Get machine-ROMs machine ID column
+static inline const uint16_t* mrdb_get_mr_machine_ids(const uint8_t* db) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbMachineRom*)(db + hdr->machine_roms_offset);
+    return (const uint16_t*)(mrdb_get_mr_rom_starts(db) + hdr->roms_count + 1);
 }}
 
-// Get manufacturers table
-static inline const MrdbManufacturer* mrdb_get_manufacturers(const uint8_t* db) {{
+// Get machine-ROMs ROM name ID column (3 bytes per mapping)
+static inline const uint8_t* mrdb_get_mr_name_ids(const uint8_t* db) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbManufacturer*)(db + hdr->manufacturers_offset);
+    return (const uint8_t*)(mrdb_get_mr_machine_ids(db) + hdr->machine_roms_count);
 }}
 
-// Get ROM names table
-static inline const MrdbRomName* mrdb_get_rom_names(const uint8_t* db) {{
+// Read entry id of a manufacturers/rom_names table (strings pool offset)
+static inline uint32_t mrdb_read_name_offset(const uint8_t* db, uint32_t table_offset, uint32_t id) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbRomName*)(db + hdr->rom_names_offset);
+    if (hdr->flags & MRDB_FLAG_NAME_OFFSET_24) {{
+        return MRDB_READ_UINT24(db + table_offset + id * 3);
+    }}
+    const uint8_t* entry = db + table_offset + id * 4;
+    return MRDB_READ_UINT24(entry) | ((uint32_t)entry[3] << 24);
 }}
 
-// Get string from pool
+// Get strings pool size once inflated (buffer size needed by mrdb_init)
+static inline uint32_t mrdb_get_strings_size(const uint8_t* db) {{
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    if (hdr->flags & MRDB_FLAG_STRINGS_DEFLATE) {{
+        uint32_t size;
+        memcpy(&size, db + hdr->strings_offset, 4);
+        return size;
+    }}
+    return hdr->desc_offset - hdr->strings_offset;
+}}
+
+// Get string from pool (NULL if the compressed pool is not inflated yet)
 static inline const char* mrdb_get_string(const uint8_t* db, uint32_t offset) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
+    if (hdr->flags & MRDB_FLAG_STRINGS_DEFLATE) {{
+        return mrdb_strings ? mrdb_strings + offset : NULL;
+    }}
     return (const char*)(db + hdr->strings_offset + offset);
 }}
 
+// Get length of a string returned by the database (stored before it, so
+// names need no strlen scan unless they are 255 bytes or longer)
+static inline size_t mrdb_get_string_length(const char* str) {{
+    uint8_t length = ((const uint8_t*)str)[-1];
+    if (length < {STRING_LENGTH_MAX}) {{
+        return length;
+    }}
+    return {STRING_LENGTH_MAX} + strlen(str + {STRING_LENGTH_MAX});
+}}
+
+// Get manufacturer name (NULL if invalid)
+static inline const char* mrdb_get_manufacturer_name(const uint8_t* db, uint32_t manufacturer_id) {{
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    if (manufacturer_id >= hdr->manufacturers_count || manufacturer_id == MRDB_NULL_ID_16) {{
+        return NULL;
+    }}
+    return mrdb_get_string(db, mrdb_read_name_offset(db, hdr->manufacturers_offset, manufacturer_id));
+}}
+
 // Get compressed description
 static inline const uint8_t* mrdb_get_description(const uint8_t* db, uint32_t offset) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
@@ -727,20 +1111,36 @@ static inline const uint8_t* mrdb_get_description(const uint8_t* db, uint32_t of
 // ROM lookup functions
 // ============================================================================
 
-#define MRDB_ROM_ENTRY_SIZE 23  // sha1(20) + name_id(3)
+#define MRDB_ROM_ENTRY_SIZE 20  // sha1(20), name IDs are in a parallel array
+
+/**
+ * Get the ROM name ID of a ROM entry.
+ *
+ * @param db  Pointer to the database
+ * @param rom Pointer to the ROM entry
+ * @return    24-bit ID into the rom_names table
+ */
+static inline uint32_t mrdb_get_rom_name_id(const uint8_t* db, const MrdbRom* rom) {{
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    const MrdbRom* roms_base = mrdb_get_roms(db);
+    const uint8_t* name_ids = (const uint8_t*)(roms_base + hdr->roms_count);
+    return MRDB_READ_UINT24(name_ids + (size_t)(rom - roms_base) * 3);
+}}
 
 /**
- * Binary search for a ROM by size and SHA1.
+ * Look up a ROM by size and SHA1 (perfect hash over the ROMs of that size).
  *
  * @param db        Pointer to the database
  * @param size_pow2 ROM size as power of 2 (e.g., 21 for 2MB)
  * @param sha1      20-byte SHA1 hash to search for
+ * @param rom_id    If not NULL, receives the 24-bit ROM ID when found
  * @return          Pointer to matching MrdbRom entry, or NULL if not found
  */
-const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1);
+const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1,
+                                     uint32_t* rom_id);
 
 /**
- * Get ROM ID from a ROM pointer.
+ * Get ROM ID from a ROM pointer (mrdb_find_rom_by_sha1 can return it directly).
  *
  * @param db  Pointer to the database
  * @param rom Pointer to the ROM entry
@@ -748,27 +1148,33 @@ const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const
  */
 static inline uint32_t mrdb_get_rom_id(const uint8_t* db, const MrdbRom* rom) {{
     const MrdbHeader* hdr = mrdb_get_header(db);
-    const MrdbRom* roms_base = mrdb_get_roms(db);
-    uint32_t index = (uint32_t)(rom - roms_base);
+    uint32_t rom_index = (uint32_t)(rom - mrdb_get_roms(db));
 
-    // Find size_pow2 from the size index
+    // Find size_pow2 from the size index: sizes are stored in ascending
+    // index order, so binary search for the last one starting at or before
+    // rom_index (empty sizes share their start with the next one and are skipped)
     const MrdbSizeIndex* size_idx = mrdb_get_size_index(db);
-    for (uint8_t sp = hdr->min_size_pow2; sp <= hdr->max_size_pow2; sp++) {{
-        uint32_t start = size_idx[sp - hdr->min_size_pow2].start_offset / MRDB_ROM_ENTRY_SIZE;
-        uint32_t end = size_idx[sp - hdr->min_size_pow2].end_offset / MRDB_ROM_ENTRY_SIZE;
-        if (index >= start && index < end) {{
-            return MRDB_MAKE_ROM_ID(sp, index - start);
+    uint32_t sel = 0;
+    uint32_t n = MRDB_NUM_SIZES;
+    while (n > 1) {{
+        uint32_t half = n / 2;
+        if (size_idx[sel + half].start_index <= rom_index) {{
+            sel += half;
         }}
+        n -= half;
+    }}
+
+    uint32_t start = size_idx[sel].start_index;
+    if (rom_index < start || rom_index - start >= size_idx[sel].count) {{
+        return MRDB_NULL_ID_24;
     }}
-    return MRDB_NULL_ID_24;
+    return MRDB_MAKE_ROM_ID(hdr->min_size_pow2 + sel, rom_index - start);
 }}
 
 // ============================================================================
 // Machine lookup functions
 // ============================================================================
 
-#define MRDB_MACHINE_ROM_ENTRY_SIZE 8  // machine_id(2) + rom_id(3) + name_id(3)
-
 /**
  * Result structure for machine lookup.
  */
@@ -782,7 +1188,7 @@ typedef struct {{
  *
  * @param db          Pointer to the database
  * @param rom         Pointer to the ROM entry (from mrdb_find_rom_by_sha1)
- * @param size_pow2   Size of the ROM (power of 2)
+ * @param size_pow2   Size of the ROM (power of 2), unused: the ROM pointer is enough
  * @param results     Array to store results
  * @param max_results Maximum number of results to return
  * @return            Number of machines found (may be > max_results if truncated)
@@ -791,20 +1197,57 @@ uint32_t mrdb_get_machines_for_rom(const uint8_t* db, const MrdbRom* rom,
                                     uint8_t size_pow2, MrdbMachineResult* results,
                                     uint32_t max_results);
 
+/**
+ * Get all machines associated with a ROM ID (from mrdb_find_rom_by_sha1).
+ *
+ * @param db          Pointer to the database
+ * @param rom_id      24-bit ROM ID
+ * @param results     Array to store results
+ * @param max_results Maximum number of results to return
+ * @return            Number of machines found (may be > max_results if truncated)
+ */
+uint32_t mrdb_get_machines_for_rom_id(const uint8_t* db, uint32_t rom_id,
+                                       MrdbMachineResult* results, uint32_t max_results);
+
 /**
  * Get machine name.
  */
 const char* mrdb_get_machine_name(const uint8_t* db, uint32_t machine_id);
 
+// Inflate window for descriptions: the shared dictionary followed by room
+// for the longest description
+#define MRDB_DESC_WINDOW_SIZE (MRDB_DESC_DICT_SIZE + MRDB_DESC_MAX_LENGTH + 1)
+
 /**
- * Get machine description (decompresses zlib data).
+ * Description decompression context, one per core or thread. Zero it (or
+ * set db to NULL) before first use: the dictionary is then copied into the
+ * window on the first call for a database, and kept for the next ones.
+ */
+typedef struct {{
+    const uint8_t* db;                     // Database whose dictionary is in window
+    uint8_t window[MRDB_DESC_WINDOW_SIZE];
+}} MrdbDescContext;
+
+/**
+ * Get machine description (inflates deflate data primed with the shared
+ * dictionary). Reentrant: all state is in the caller's context.
  *
  * @param db          Pointer to the database
  * @param machine_id  Machine ID
  * @param buffer      Output buffer for decompressed description
- * @param buffer_size Size of output buffer
+ * @param buffer_size Size of output buffer (longer descriptions are truncated)
+ * @param ctx         Decompression context (not shared between concurrent calls)
  * @return            Length of description, or 0 if failed/empty
  */
+uint32_t mrdb_get_machine_description_r(const uint8_t* db, uint32_t machine_id,
+                                         char* buffer, uint32_t buffer_size,
+                                         MrdbDescContext* ctx);
+
+/**
+ * Get machine description with a static context (about 16 KB of RAM,
+ * not reentrant: use mrdb_get_machine_description_r from several cores,
+ * threads or interrupt handlers).
+ */
 uint32_t mrdb_get_machine_description(const uint8_t* db, uint32_t machine_id,
                                        char* buffer, uint32_t buffer_size);
 
@@ -856,16 +1299,61 @@ const char* mrdb_get_rom_name(const uint8_t* db, uint32_t name_id);
 #endif // MAME_ROM_DATABASE_H
 '''
 
-    with open(output_path, 'w') as f:
-        f.write(header_content)
+    write_if_changed(output_path, header_content)
 
 
-def generate_data_file(binary_data, output_path):
-    """Generate C source file with embedded binary data and search function."""
+def generate_data_file(total_size, bin_name, output_path):
+    """Generate C source file embedding the binary file with .incbin.
+
+    The assembler reads the binary directly, so the compiler never parses
+    the data; the access functions live in a separate source file.
+    """
     print(f"Generating C data file: {output_path}")
 
+    data_content = f'''// Auto-generated MAME ROM database binary data
+// Generated by generate_embedded_database.py
+// DO NOT EDIT MANUALLY
+
+#include <stdint.h>
+
+#include "mame_rom_database.h"
+
+// Database size: {total_size} bytes ({total_size / 1024 / 1024:.2f} MB)
+
+// Binary file read by the assembler: relative to the build directory, or to
+// an include directory passed with -Wa,-I (override with -DMRDB_BIN_PATH)
+#ifndef MRDB_BIN_PATH
+#define MRDB_BIN_PATH "{bin_name}"
+#endif
+
+// Aligned on 64 bytes so that the header and tables start on a cache line
+__asm__(
+    "    .pushsection .rodata.mame_rom_database, \\"a\\"\\n"
+    "    .global mame_rom_database\\n"
+    "    .type mame_rom_database, %object\\n"
+    "    .balign 64\\n"
+    "mame_rom_database:\\n"
+    "    .incbin \\"" MRDB_BIN_PATH "\\"\\n"
+    "    .size mame_rom_database, . - mame_rom_database\\n"
+    "    .popsection\\n"
+);
+
+extern const uint8_t mame_rom_database[];
+
+const uint8_t* mrdb_get_data(void) {{
+    return mame_rom_database;
+}}
+'''
+
+    write_if_changed(output_path, data_content)
+
+
+def generate_code_file(output_path):
+    """Generate C source file with the database access functions."""
+    print(f"Generating C source file: {output_path}")
+
     lines = [
-        '// Auto-generated MAME ROM database binary data',
+        '// Auto-generated MAME ROM database access functions',
         '// Generated by generate_embedded_database.py',
         '// DO NOT EDIT MANUALLY',
         '',
@@ -880,32 +1368,55 @@ def generate_data_file(binary_data, output_path):
         '#include "miniz.h"',
         '',
         '#include "mame_rom_database.h"',
-        '',
-        f'// Database size: {len(binary_data)} bytes ({len(binary_data) / 1024 / 1024:.2f} MB)',
-        '',
-        'const uint8_t mame_rom_database[] = {',
     ]
 
-    # Write data in rows of 16 bytes
-    for i in range(0, len(binary_data), 16):
-        chunk = binary_data[i:i+16]
-        hex_values = ', '.join(f'0x{b:02x}' for b in chunk)
-        lines.append(f'    {hex_values},')
-
-    lines.append('};')
-    lines.append('')
-    lines.append('const uint8_t* mrdb_get_data(void) {')
-    lines.append('    return mame_rom_database;')
-    lines.append('}')
-    lines.append('')
-
-    # Add binary search function
-    binary_search_code = '''
+    # Add database access functions
+    functions_code = '''
+// ============================================================================
+// Initialization
+// ============================================================================
+
+const char* mrdb_strings = NULL;
+
+int mrdb_init(const uint8_t* db, uint8_t* buffer, uint32_t buffer_size) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
+
+    if (!(hdr->flags & MRDB_FLAG_STRINGS_DEFLATE)) {
+        return 1;
+    }
+
+    // Strings pool: inflated size (4 bytes), then a raw deflate stream
+    uint32_t size = mrdb_get_strings_size(db);
+    if (!buffer || buffer_size < size) {
+        return 0;
+    }
+    const uint8_t* compressed = db + hdr->strings_offset + 4;
+    size_t in_len = hdr->desc_offset - hdr->strings_offset - 4;
+    size_t out_len = tinfl_decompress_mem_to_mem(buffer, size, compressed, in_len, 0);
+    if (out_len != size) {
+        return 0;
+    }
+
+    mrdb_strings = (const char*)buffer;
+    return 1;
+}
+
 // ============================================================================
-// Binary search for ROM by size and SHA1
+// Perfect hash lookup for ROM by size and SHA1
 // ============================================================================
 
-const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1) {
+// MurmurHash3 32-bit finalizer
+static inline uint32_t mrdb_fmix32(uint32_t h) {
+    h ^= h >> 16;
+    h *= 0x85EBCA6B;
+    h ^= h >> 13;
+    h *= 0xC2B2AE35;
+    h ^= h >> 16;
+    return h;
+}
+
+const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1,
+                                     uint32_t* rom_id) {
     const MrdbHeader* hdr = mrdb_get_header(db);
 
     // Validate size_pow2 range
@@ -914,93 +1425,77 @@ const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const
     }
 
     // Get size index entry for this size
-    const MrdbSizeIndex* size_index = mrdb_get_size_index(db);
-    uint32_t idx = size_pow2 - hdr->min_size_pow2;
+    const MrdbSizeIndex* size_index = &mrdb_get_size_index(db)[size_pow2 - hdr->min_size_pow2];
 
-    uint32_t start_offset = size_index[idx].start_offset;
-    uint32_t end_offset = size_index[idx].end_offset;
+    uint32_t n = size_index->count;
 
     // Empty range check
-    if (start_offset >= end_offset) {
+    if (n == 0) {
         return NULL;
     }
 
-    // Get pointer to ROMs table base
     const uint8_t* roms_base = db + hdr->roms_offset;
 
-    // Binary search within the range
-    // Offsets are in bytes, ROM entry size is 23 bytes
-    const uint8_t* left = roms_base + start_offset;
-    const uint8_t* right = roms_base + end_offset - MRDB_ROM_ENTRY_SIZE;
-
-    while (left <= right) {
-        // Calculate middle pointer (aligned to ROM entry boundary)
-        size_t left_idx = (left - roms_base) / MRDB_ROM_ENTRY_SIZE;
-        size_t right_idx = (right - roms_base) / MRDB_ROM_ENTRY_SIZE;
-        size_t mid_idx = left_idx + (right_idx - left_idx) / 2;
-        const uint8_t* mid = roms_base + mid_idx * MRDB_ROM_ENTRY_SIZE;
-
-        // Compare SHA1 (first 20 bytes of ROM entry)
-        int cmp = memcmp(mid, sha1, 20);
-
-        if (cmp == 0) {
-            // Found it
-            return (const MrdbRom*)mid;
-        } else if (cmp < 0) {
-            // mid < sha1, search right half
-            left = mid + MRDB_ROM_ENTRY_SIZE;
-        } else {
-            // mid > sha1, search left half
-            right = mid - MRDB_ROM_ENTRY_SIZE;
-        }
+    // ROMs of a size are stored at their slot in a minimal perfect hash of
+    // their SHA1s. SHA1s are uniformly random: the first word picks a bucket,
+    // the second one, mixed with the bucket's pilot, gives the table position.
+    uint32_t k0, k1;
+    memcpy(&k0, sha1, 4);
+    memcpy(&k1, sha1 + 4, 4);
+
+    const uint8_t* pilots = roms_base + size_index->hash_offset;
+    uint32_t bucket = (uint32_t)(((uint64_t)k0 * size_index->bucket_count) >> 32);
+    uint32_t pilot = pilots[bucket * 2] | ((uint32_t)pilots[bucket * 2 + 1] << 8);
+
+    uint32_t table_size = n + size_index->remap_count;
+    uint32_t slot = (uint32_t)(((uint64_t)mrdb_fmix32(k1 ^ mrdb_fmix32(pilot)) * table_size) >> 32);
+    if (slot >= n) {
+        // Positions past the ROM count are remapped to the free slots
+        const uint8_t* remap = pilots + size_index->bucket_count * 2 + (slot - n) * 2;
+        slot = remap[0] | ((uint32_t)remap[1] << 8);
     }
 
-    // Not found
-    return NULL;
+    // Single compare: the slot holds this SHA1 if the ROM is known
+    const uint8_t* entry = roms_base + (size_t)(size_index->start_index + slot) * MRDB_ROM_ENTRY_SIZE;
+    if (memcmp(entry, sha1, 20) != 0) {
+        return NULL;
+    }
+    if (rom_id) {
+        *rom_id = MRDB_MAKE_ROM_ID(size_pow2, slot);
+    }
+    return (const MrdbRom*)entry;
 }
 
 // ============================================================================
 // Machine lookup functions
 // ============================================================================
 
-#define MRDB_MACHINE_ROM_ENTRY_SIZE 8  // machine_id(2) + rom_id(3) + name_id(3)
-
-/**
- * Find first machine-ROM mapping entry for a given ROM ID.
- * Uses binary search on the machine_roms table (sorted by rom_id).
- *
- * @param db     Pointer to the database
- * @param rom_id 24-bit ROM ID to search for
- * @return       Pointer to first MrdbMachineRom entry, or NULL if not found
- */
-static const MrdbMachineRom* mrdb_find_first_machine_rom(const uint8_t* db, uint32_t rom_id) {
+// Collect the machines of the ROM at rom_index in the ROMs table
+static uint32_t mrdb_get_machines_at(const uint8_t* db, uint32_t rom_index,
+                                     MrdbMachineResult* results, uint32_t max_results) {
     const MrdbHeader* hdr = mrdb_get_header(db);
-    const uint8_t* base = db + hdr->machine_roms_offset;
-
-    uint32_t left = 0;
-    uint32_t right = hdr->machine_roms_count;
-    uint32_t result = hdr->machine_roms_count;  // Invalid index
-
-    while (left < right) {
-        uint32_t mid = left + (right - left) / 2;
-        const uint8_t* entry = base + mid * MRDB_MACHINE_ROM_ENTRY_SIZE;
-        uint32_t mid_rom_id = MRDB_READ_UINT24(entry + 2);
-
-        if (mid_rom_id >= rom_id) {
-            if (mid_rom_id == rom_id) {
-                result = mid;
-            }
-            right = mid;
-        } else {
-            left = mid + 1;
-        }
-    }
 
-    if (result >= hdr->machine_roms_count) {
-        return NULL;
+    // The ROM's mappings are the run between its start and the next ROM's
+    if (rom_index >= hdr->roms_count) {
+        return 0;
+    }
+    const uint32_t* rom_starts = mrdb_get_mr_rom_starts(db);
+    uint32_t first = rom_starts[rom_index];
+    uint32_t last = rom_starts[rom_index + 1];
+
+    // Collect the machines of the run
+    uint32_t count = last - first;
+    if (results) {
+        const uint16_t* machine_ids = mrdb_get_mr_machine_ids(db);
+        const uint8_t* name_ids = mrdb_get_mr_name_ids(db);
+        uint32_t n = count < max_results ? count : max_results;
+        for (uint32_t i = 0; i < n; i++) {
+            results[i].machine_id = machine_ids[first + i];
+            results[i].rom_name_id = MRDB_READ_UINT24(name_ids + (size_t)(first + i) * 3);
+        }
     }
 
-    return (const MrdbMachineRom*)(base + result * MRDB_MACHINE_ROM_ENTRY_SIZE);
+    return count;
 }
 
 /**
@@ -1008,7 +1503,7 @@ static const MrdbMachineRom* mrdb_find_first_machine_rom(const uint8_t* db, uint
  *
  * @param db          Pointer to the database
  * @param rom         Pointer to the ROM entry (from mrdb_find_rom_by_sha1)
- * @param size_pow2   Size of the ROM (power of 2)
+ * @param size_pow2   Size of the ROM (power of 2), unused: the ROM pointer is enough
  * @param results     Array to store results
  * @param max_results Maximum number of results to return
  * @return            Number of machines found (may be > max_results if truncated)
@@ -1016,42 +1511,35 @@ static const MrdbMachineRom* mrdb_find_first_machine_rom(const uint8_t* db, uint
 uint32_t mrdb_get_machines_for_rom(const uint8_t* db, const MrdbRom* rom,
                                     uint8_t size_pow2, MrdbMachineResult* results,
                                     uint32_t max_results) {
-    const MrdbHeader* hdr = mrdb_get_header(db);
+    (void)size_pow2;
 
-    // Calculate ROM ID from pointer
-    const MrdbRom* roms_base = mrdb_get_roms(db);
-    const MrdbSizeIndex* size_idx = mrdb_get_size_index(db);
-    uint32_t size_offset = size_idx[size_pow2 - hdr->min_size_pow2].start_offset;
-    uint32_t rom_index = ((const uint8_t*)rom - (const uint8_t*)roms_base - size_offset) / MRDB_ROM_ENTRY_SIZE;
-    uint32_t rom_id = MRDB_MAKE_ROM_ID(size_pow2, rom_index);
+    // Exact pointer difference: a multiplication, no division
+    return mrdb_get_machines_at(db, (uint32_t)(rom - mrdb_get_roms(db)), results, max_results);
+}
+
+/**
+ * Get all machines associated with a ROM ID.
+ *
+ * @param db          Pointer to the database
+ * @param rom_id      24-bit ROM ID (size_pow2 and index within the size)
+ * @param results     Array to store results
+ * @param max_results Maximum number of results to return
+ * @return            Number of machines found (may be > max_results if truncated)
+ */
+uint32_t mrdb_get_machines_for_rom_id(const uint8_t* db, uint32_t rom_id,
+                                       MrdbMachineResult* results, uint32_t max_results) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
 
-    // Find first machine-ROM entry
-    const MrdbMachineRom* mr = mrdb_find_first_machine_rom(db, rom_id);
-    if (!mr) {
+    uint32_t size_pow2 = MRDB_ROM_ID_SIZE_POW2(rom_id);
+    if (size_pow2 < hdr->min_size_pow2 || size_pow2 > hdr->max_size_pow2) {
         return 0;
     }
-
-    // Collect all machines with this ROM
-    const uint8_t* base = db + hdr->machine_roms_offset;
-    const uint8_t* end = base + hdr->machine_roms_count * MRDB_MACHINE_ROM_ENTRY_SIZE;
-    const uint8_t* ptr = (const uint8_t*)mr;
-
-    uint32_t count = 0;
-    while (ptr < end) {
-        uint32_t entry_rom_id = MRDB_READ_UINT24(ptr + 2);
-        if (entry_rom_id != rom_id) {
-            break;
-        }
-
-        if (count < max_results && results) {
-            results[count].machine_id = (uint32_t)(ptr[0] | (ptr[1] << 8));
-            results[count].rom_name_id = MRDB_READ_UINT24(ptr + 5);
-        }
-        count++;
-        ptr += MRDB_MACHINE_ROM_ENTRY_SIZE;
+    const MrdbSizeIndex* size_index = &mrdb_get_size_index(db)[size_pow2 - hdr->min_size_pow2];
+    uint32_t index = MRDB_ROM_ID_INDEX(rom_id);
+    if (index >= size_index->count) {
+        return 0;
     }
-
-    return count;
+    return mrdb_get_machines_at(db, size_index->start_index + index, results, max_results);
 }
 
 /**
@@ -1070,15 +1558,6 @@ const char* mrdb_get_machine_name(const uint8_t* db, uint32_t machine_id) {
     return mrdb_get_string(db, machine->name_offset);
 }
 
-/**
- * Get machine description (decompresses zlib data).
- *
- * @param db         Pointer to the database
- * @param machine_id Machine ID
- * @param buffer     Output buffer for decompressed description
- * @param buffer_size Size of output buffer
- * @return           Length of description, or 0 if failed/empty
- */
 /**
  * Get ROM filename for a machine.
  *
@@ -1091,21 +1570,30 @@ const char* mrdb_get_rom_name(const uint8_t* db, uint32_t name_id) {
     if (name_id >= hdr->rom_names_count || name_id == MRDB_NULL_ID_24) {
         return NULL;
     }
-    const MrdbRomName* rom_name = &mrdb_get_rom_names(db)[name_id];
-    return mrdb_get_string(db, rom_name->name_offset);
+    return mrdb_get_string(db, mrdb_read_name_offset(db, hdr->rom_names_offset, name_id));
 }
 
 /**
- * Get machine description (decompresses zlib data using tinfl).
+ * Get machine description (inflates deflate data using tinfl).
+ *
+ * Descriptions are raw deflate streams primed with the preset dictionary
+ * stored at the start of the descriptions pool: back-references may reach
+ * into the dictionary, so the output is inflated right after a copy of it.
  *
  * @param db          Pointer to the database
  * @param machine_id  Machine ID
  * @param buffer      Output buffer for decompressed description
- * @param buffer_size Size of output buffer
+ * @param buffer_size Size of output buffer (longer descriptions are truncated)
+ * @param ctx         Decompression context holding the inflate window
  * @return            Length of description (excluding null terminator), or 0 if failed/empty
  */
-uint32_t mrdb_get_machine_description(const uint8_t* db, uint32_t machine_id,
-                                       char* buffer, uint32_t buffer_size) {
+uint32_t mrdb_get_machine_description_r(const uint8_t* db, uint32_t machine_id,
+                                         char* buffer, uint32_t buffer_size,
+                                         MrdbDescContext* ctx) {
+    // The dictionary is copied once per context, inflating only overwrites
+    // what follows it
+    uint8_t* window = ctx->window;
+
     const MrdbHeader* hdr = mrdb_get_header(db);
 
     if (machine_id >= hdr->machines_count || !buffer || buffer_size == 0) {
@@ -1115,45 +1603,50 @@ uint32_t mrdb_get_machine_description(const uint8_t* db, uint32_t machine_id,
     const MrdbMachine* machine = &mrdb_get_machines(db)[machine_id];
 
     // Check if description exists
-    if (machine->desc_length == 0) {
+    if (MRDB_DESC_LENGTH(machine) == 0 || hdr->desc_dict_size > MRDB_DESC_DICT_SIZE) {
         buffer[0] = '\\0';
         return 0;
     }
 
-    // Get compressed data (zlib format: 2-byte header + deflate data + 4-byte checksum)
-    const uint8_t* compressed = mrdb_get_description(db, machine->desc_offset);
-    uint8_t comp_len = machine->desc_length;
+    if (ctx->db != db) {
+        memcpy(window, mrdb_get_description(db, 0), hdr->desc_dict_size);
+        ctx->db = db;
+    }
 
-    // Skip zlib header (2 bytes) and checksum (4 bytes)
-    if (comp_len <= 6) {
+    // Decompress using tinfl
+    tinfl_decompressor inflator;
+    tinfl_init(&inflator);
+    const uint8_t* compressed = mrdb_get_description(db, MRDB_DESC_OFFSET(machine));
+    size_t in_len = MRDB_DESC_LENGTH(machine);
+    uint8_t* out = window + hdr->desc_dict_size;
+    size_t out_len = MRDB_DESC_WINDOW_SIZE - hdr->desc_dict_size;
+    tinfl_status status = tinfl_decompress(&inflator, compressed, &in_len, window, out, &out_len,
+                                           TINFL_FLAG_USING_NON_WRAPPING_OUTPUT_BUF);
+    if (status != TINFL_STATUS_DONE) {
         buffer[0] = '\\0';
         return 0;
     }
-    const uint8_t* deflate_data = compressed + 2;
-    size_t deflate_len = comp_len - 6;
 
-    // Decompress using tinfl
-    size_t out_len = buffer_size - 1;
-    int status = tinfl_decompress_mem_to_mem(buffer, out_len, deflate_data, deflate_len,
-                                              TINFL_FLAG_PARSE_ZLIB_HEADER);
-
-    if (status < 0) {
-        // Try without skipping header (raw deflate)
-        status = tinfl_decompress_mem_to_mem(buffer, out_len, compressed + 2, comp_len - 6, 0);
-        if (status < 0) {
-            buffer[0] = '\\0';
-            return 0;
-        }
+    if (out_len > buffer_size - 1) {
+        out_len = buffer_size - 1;
     }
+    memcpy(buffer, out, out_len);
+    buffer[out_len] = '\\0';
+    return (uint32_t)out_len;
+}
 
-    buffer[status] = '\\0';
-    return (uint32_t)status;
+/**
+ * Get machine description with a static context (not reentrant).
+ */
+uint32_t mrdb_get_machine_description(const uint8_t* db, uint32_t machine_id,
+                                       char* buffer, uint32_t buffer_size) {
+    static MrdbDescContext ctx;
+    return mrdb_get_machine_description_r(db, machine_id, buffer, buffer_size, &ctx);
 }
 '''
-    lines.append(binary_search_code)
+    lines.append(functions_code)
 
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    write_if_changed(output_path, '\n'.join(lines))
 
 
 # ============================================================================
@@ -1174,6 +1667,8 @@ def main():
                         help=f"Maximum ROM size as power of 2 (default: {DEFAULT_MAX_SIZE_POW2})")
     parser.add_argument('--bin-only', action='store_true',
                         help="Only generate binary file, no C headers")
+    parser.add_argument('--compress-strings', action='store_true',
+                        help="Deflate the strings pool (inflated into RAM by mrdb_init)")
     args = parser.parse_args()
 
     min_size_pow2 = args.min_size
@@ -1201,29 +1696,29 @@ def main():
     # Build descriptions pool
     desc_pool, desc_info = build_descriptions_pool(data)
 
-    # Generate binary
-    binary_data = generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
-                                  min_size_pow2, max_size_pow2)
-
-    # Output files
+    # Generate binary (written straight to the output file)
     bin_path = script_dir / f"{args.output}.bin"
-    with open(bin_path, 'wb') as f:
-        f.write(binary_data)
-    print(f"\nBinary file: {bin_path} ({len(binary_data)} bytes)")
+    total_size = generate_binary(data, strings_pool, string_offsets, desc_pool, desc_info,
+                                 str(bin_path), min_size_pow2, max_size_pow2,
+                                 compress_strings=args.compress_strings)
+    print(f"\nBinary file: {bin_path} ({total_size} bytes)")
 
     if not args.bin_only:
         # Generate C header
         header_path = script_dir / "include" / f"{args.output}.h"
         header_path.parent.mkdir(exist_ok=True)
-        generate_header(data, binary_data, str(header_path), min_size_pow2, max_size_pow2)
+        generate_header(data, total_size, desc_info, str(header_path), min_size_pow2, max_size_pow2)
 
-        # Generate C data file
-        data_path = script_dir / "src" / f"{args.output}.c"
-        data_path.parent.mkdir(exist_ok=True)
-        generate_data_file(binary_data, str(data_path))
+        # Generate C source files (access functions, embedded data)
+        code_path = script_dir / "src" / f"{args.output}.c"
+        code_path.parent.mkdir(exist_ok=True)
+        generate_code_file(str(code_path))
+        data_path = script_dir / "src" / f"{args.output}_data.c"
+        generate_data_file(total_size, bin_path.name, str(data_path))
 
         print(f"C header: {header_path}")
-        print(f"C source: {data_path}")
+        print(f"C source: {code_path}")
+        print(f"C data: {data_path}")
 
     print("\nDone!")
 
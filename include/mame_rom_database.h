@@ -5,7 +5,9 @@
 #ifndef MAME_ROM_DATABASE_H
 #define MAME_ROM_DATABASE_H
 
+#include <stddef.h>
 #include <stdint.h>
+#include <string.h>
 
 #ifdef __cplusplus
 extern "C" {
@@ -16,7 +18,7 @@ extern "C" {
 // ============================================================================
 
 #define MRDB_MAGIC          0x4244524D  // "MRDB" in little-endian
-#define MRDB_VERSION        1
+#define MRDB_VERSION        11
 #define MRDB_MIN_SIZE_POW2  11
 #define MRDB_MAX_SIZE_POW2  23
 #define MRDB_NUM_SIZES      13
@@ -24,6 +26,10 @@ extern "C" {
 #define MRDB_NULL_ID_24     0xFFFFFF
 #define MRDB_NULL_ID_16     0xFFFF
 
+// Header flags
+#define MRDB_FLAG_NAME_OFFSET_24 0x01  // Manufacturers/ROM names entries are 3-byte offsets
+#define MRDB_FLAG_STRINGS_DEFLATE 0x02 // Strings pool is deflated: call mrdb_init before use
+
 // ============================================================================
 // Database statistics
 // ============================================================================
@@ -33,14 +39,16 @@ extern "C" {
 #define MRDB_MACHINE_ROMS_COUNT 408997
 #define MRDB_MANUFACTURERS_COUNT 4233
 #define MRDB_ROM_NAMES_COUNT    161642
-#define MRDB_TOTAL_SIZE         13157773
+#define MRDB_TOTAL_SIZE         11452318
+#define MRDB_DESC_DICT_SIZE     16384
+#define MRDB_DESC_MAX_LENGTH    231
 
 // ============================================================================
 // Data structures
 // ============================================================================
 
-// Header structure (64 bytes)
-typedef struct __attribute__((packed)) {
+// Header structure (64 bytes, naturally aligned: the database is 64-byte aligned)
+typedef struct {
     uint32_t magic;
     uint16_t version;
     uint8_t min_size_pow2;
@@ -60,61 +68,83 @@ typedef struct __attribute__((packed)) {
     uint32_t rom_names_offset;
     uint32_t strings_offset;
     uint32_t desc_offset;
+
+    uint8_t flags;            // MRDB_FLAG_* bits
+    uint8_t reserved;
+    uint16_t desc_dict_size;  // Preset dictionary at the start of the descriptions pool
 } MrdbHeader;
 
-// Size index entry (8 bytes per size)
-// Stores byte offsets relative to roms_offset for direct pointer access
-typedef struct __attribute__((packed)) {
-    uint32_t start_offset;    // Byte offset to first ROM of this size (relative to roms_offset)
-    uint32_t end_offset;      // Byte offset past last ROM of this size (relative to roms_offset)
+// Size index entry (16 bytes per size, naturally aligned)
+// Stores ROM indices into the ROMs table, so no lookup divides byte offsets
+typedef struct {
+    uint32_t start_index;     // Index of the first ROM of this size in the ROMs table
+    uint32_t count;           // Number of ROMs of this size
+    uint32_t hash_offset;     // Byte offset to the perfect hash pilots (relative to roms_offset)
+    uint16_t bucket_count;    // Number of 16-bit pilots
+    uint16_t remap_count;     // Number of 16-bit slots for hash positions past the ROM count
 } MrdbSizeIndex;
 
-// ROM entry (23 bytes)
-typedef struct __attribute__((packed)) {
+#ifdef __cplusplus
+#define MRDB_STATIC_ASSERT(cond, msg) static_assert(cond, msg)
+#else
+#define MRDB_STATIC_ASSERT(cond, msg) _Static_assert(cond, msg)
+#endif
+
+MRDB_STATIC_ASSERT(sizeof(MrdbHeader) == 64, "MrdbHeader must be 64 bytes");
+MRDB_STATIC_ASSERT(offsetof(MrdbHeader, size_index_offset) % 4 == 0, "MrdbHeader offsets must be aligned");
+MRDB_STATIC_ASSERT(offsetof(MrdbHeader, desc_dict_size) == 0x3E, "MrdbHeader layout mismatch");
+MRDB_STATIC_ASSERT(sizeof(MrdbSizeIndex) == 16, "MrdbSizeIndex must be 16 bytes");
+
+// ROM entry (20 bytes), the ROMs table is the array of all SHA1s followed
+// by a parallel array of 24-bit ROM name IDs (see mrdb_get_rom_name_id)
+typedef struct {
     uint8_t sha1[20];
-    uint8_t name_id[3];       // 24-bit ID into rom_names table
 } MrdbRom;
 
-// Machine entry (17 bytes)
-typedef struct __attribute__((packed)) {
+// Machine entry (16 bytes, naturally aligned)
+typedef struct {
     uint32_t name_offset;     // Offset into strings pool
-    uint32_t desc_offset;     // Offset into descriptions pool
-    uint8_t desc_length;      // Compressed description length
+    uint32_t desc;            // Descriptions pool offset | compressed length << 24 (see MRDB_DESC_*)
     uint16_t cloneof_id;      // 16-bit machine ID or 0xFFFF
     uint16_t romof_id;        // 16-bit machine ID or 0xFFFF
     uint16_t year;            // Release year (16-bit)
     uint16_t manufacturer_id; // 16-bit ID or 0xFFFF
 } MrdbMachine;
 
-// Machine-ROM mapping entry (8 bytes)
-typedef struct __attribute__((packed)) {
-    uint16_t machine_id;      // 16-bit machine ID
-    uint8_t rom_id[3];        // 24-bit ROM ID (size_pow2 << 16 | index)
-    uint8_t name_id[3];       // 24-bit ROM name ID in this machine
-} MrdbMachineRom;
+MRDB_STATIC_ASSERT(sizeof(MrdbMachine) == 16, "MrdbMachine must be 16 bytes");
 
-// Manufacturer entry (4 bytes)
-typedef struct __attribute__((packed)) {
-    uint32_t name_offset;     // Offset into strings pool
-} MrdbManufacturer;
+// Description offset (bits 0-23) and compressed length (bits 24-31) of a machine
+#define MRDB_DESC_OFFSET(machine) ((machine)->desc & 0xFFFFFF)
+#define MRDB_DESC_LENGTH(machine) ((machine)->desc >> 24)
 
-// ROM name entry (4 bytes)
-typedef struct __attribute__((packed)) {
-    uint32_t name_offset;     // Offset into strings pool
-} MrdbRomName;
+// Machine-ROM mappings, sorted by ROM, stored as columns starting at
+// machine_roms_offset (see mrdb_get_mr_rom_starts):
+//   uint32_t rom_start[roms_count + 1]  First mapping of each ROM (ROMs table
+//                                       order), then machine_roms_count
+//   uint16_t machine_id[count]          16-bit machine ID
+//   uint8_t name_id[count][3]           24-bit ROM name ID in this machine
+
+// Manufacturer and ROM name entries: offset into strings pool, 3 bytes if
+// MRDB_FLAG_NAME_OFFSET_24 is set, 4 bytes otherwise (see mrdb_read_name_offset)
 
 // ============================================================================
 // Helper macros for 24-bit ID handling
 // ============================================================================
 
-#define MRDB_READ_UINT24(ptr) \
-    ((uint32_t)(ptr)[0] | ((uint32_t)(ptr)[1] << 8) | ((uint32_t)(ptr)[2] << 16))
+// Read a little-endian 24-bit value. Where unaligned loads are cheap this is
+// a single 4-byte load: the database ends with a padding byte, so the load
+// never reads past it.
+static inline uint32_t mrdb_read_uint24(const uint8_t* ptr) {
+#if defined(__x86_64__) || defined(__i386__) || defined(__aarch64__) || defined(__ARM_FEATURE_UNALIGNED)
+    uint32_t value;
+    memcpy(&value, ptr, 4);
+    return value & 0xFFFFFF;
+#else
+    return (uint32_t)ptr[0] | ((uint32_t)ptr[1] << 8) | ((uint32_t)ptr[2] << 16);
+#endif
+}
 
-#define MRDB_WRITE_UINT24(ptr, val) do { \
-    (ptr)[0] = (uint8_t)((val) & 0xFF); \
-    (ptr)[1] = (uint8_t)(((val) >> 8) & 0xFF); \
-    (ptr)[2] = (uint8_t)(((val) >> 16) & 0xFF); \
-} while(0)
+#define MRDB_READ_UINT24(ptr) mrdb_read_uint24((const uint8_t*)(ptr))
 
 // Extract size_pow2 from ROM ID
 #define MRDB_ROM_ID_SIZE_POW2(rom_id) (((rom_id) >> 16) & 0xFF)
@@ -132,6 +162,25 @@ typedef struct __attribute__((packed)) {
 // Get pointer to embedded database
 const uint8_t* mrdb_get_data(void);
 
+/**
+ * Prepare the database for access.
+ *
+ * Only needed if the database was generated with --compress-strings
+ * (MRDB_FLAG_STRINGS_DEFLATE): the strings pool is then inflated once into
+ * buffer, which must stay valid and hold mrdb_get_strings_size(db) bytes.
+ * That is about 2.5 MB of RAM for a complete MAME database, more than the
+ * Pico 2 SRAM (use PSRAM), for about 1.7 MB of flash saved.
+ *
+ * @param db          Pointer to the database
+ * @param buffer      Strings pool buffer (unused without the flag)
+ * @param buffer_size Size of the buffer
+ * @return            1 on success, 0 if the buffer is too small or the pool is corrupt
+ */
+int mrdb_init(const uint8_t* db, uint8_t* buffer, uint32_t buffer_size);
+
+// Inflated strings pool, set by mrdb_init (compressed strings pool only)
+extern const char* mrdb_strings;
+
 // Get database header
 static inline const MrdbHeader* mrdb_get_header(const uint8_t* db) {
     return (const MrdbHeader*)db;
@@ -155,30 +204,73 @@ static inline const MrdbMachine* mrdb_get_machines(const uint8_t* db) {
     return (const MrdbMachine*)(db + hdr->machines_offset);
 }
 
-// Get machine-ROMs table
-static inline const MrdbMachineRom* mrdb_get_machine_roms(const uint8_t* db) {
+// Get machine-ROMs first mapping index of each ROM
+static inline const uint32_t* mrdb_get_mr_rom_starts(const uint8_t* db) {
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbMachineRom*)(db + hdr->machine_roms_offset);
+    return (const uint32_t*)(db + hdr->machine_roms_offset);
 }
 
-// Get manufacturers table
-static inline const MrdbManufacturer* mrdb_get_manufacturers(const uint8_t* db) {
+// Get machine-ROMs machine ID column
+static inline const uint16_t* mrdb_get_mr_machine_ids(const uint8_t* db) {
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbManufacturer*)(db + hdr->manufacturers_offset);
+    return (const uint16_t*)(mrdb_get_mr_rom_starts(db) + hdr->roms_count + 1);
 }
 
-// Get ROM names table
-static inline const MrdbRomName* mrdb_get_rom_names(const uint8_t* db) {
+// Get machine-ROMs ROM name ID column (3 bytes per mapping)
+static inline const uint8_t* mrdb_get_mr_name_ids(const uint8_t* db) {
     const MrdbHeader* hdr = mrdb_get_header(db);
-    return (const MrdbRomName*)(db + hdr->rom_names_offset);
+    return (const uint8_t*)(mrdb_get_mr_machine_ids(db) + hdr->machine_roms_count);
+}
+
+// Read entry id of a manufacturers/rom_names table (strings pool offset)
+static inline uint32_t mrdb_read_name_offset(const uint8_t* db, uint32_t table_offset, uint32_t id) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    if (hdr->flags & MRDB_FLAG_NAME_OFFSET_24) {
+        return MRDB_READ_UINT24(db + table_offset + id * 3);
+    }
+    const uint8_t* entry = db + table_offset + id * 4;
+    return MRDB_READ_UINT24(entry) | ((uint32_t)entry[3] << 24);
 }
 
-// Get string from pool
+// Get strings pool size once inflated (buffer size needed by mrdb_init)
+static inline uint32_t mrdb_get_strings_size(const uint8_t* db) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    if (hdr->flags & MRDB_FLAG_STRINGS_DEFLATE) {
+        uint32_t size;
+        memcpy(&size, db + hdr->strings_offset, 4);
+        return size;
+    }
+    return hdr->desc_offset - hdr->strings_offset;
+}
+
+// Get string from pool (NULL if the compressed pool is not inflated yet)
 static inline const char* mrdb_get_string(const uint8_t* db, uint32_t offset) {
     const MrdbHeader* hdr = mrdb_get_header(db);
+    if (hdr->flags & MRDB_FLAG_STRINGS_DEFLATE) {
+        return mrdb_strings ? mrdb_strings + offset : NULL;
+    }
     return (const char*)(db + hdr->strings_offset + offset);
 }
 
+// Get length of a string returned by the database (stored before it, so
+// names need no strlen scan unless they are 255 bytes or longer)
+static inline size_t mrdb_get_string_length(const char* str) {
+    uint8_t length = ((const uint8_t*)str)[-1];
+    if (length < 255) {
+        return length;
+    }
+    return 255 + strlen(str + 255);
+}
+
+// Get manufacturer name (NULL if invalid)
+static inline const char* mrdb_get_manufacturer_name(const uint8_t* db, uint32_t manufacturer_id) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    if (manufacturer_id >= hdr->manufacturers_count || manufacturer_id == MRDB_NULL_ID_16) {
+        return NULL;
+    }
+    return mrdb_get_string(db, mrdb_read_name_offset(db, hdr->manufacturers_offset, manufacturer_id));
+}
+
 // Get compressed description
 static inline const uint8_t* mrdb_get_description(const uint8_t* db, uint32_t offset) {
     const MrdbHeader* hdr = mrdb_get_header(db);
@@ -189,20 +281,36 @@ static inline const uint8_t* mrdb_get_description(const uint8_t* db, uint32_t of
 // ROM lookup functions
 // ============================================================================
 
-#define MRDB_ROM_ENTRY_SIZE 23  // sha1(20) + name_id(3)
+#define MRDB_ROM_ENTRY_SIZE 20  // sha1(20), name IDs are in a parallel array
 
 /**
- * Binary search for a ROM by size and SHA1.
+ * Get the ROM name ID of a ROM entry.
+ *
+ * @param db  Pointer to the database
+ * @param rom Pointer to the ROM entry
+ * @return    24-bit ID into the rom_names table
+ */
+static inline uint32_t mrdb_get_rom_name_id(const uint8_t* db, const MrdbRom* rom) {
+    const MrdbHeader* hdr = mrdb_get_header(db);
+    const MrdbRom* roms_base = mrdb_get_roms(db);
+    const uint8_t* name_ids = (const uint8_t*)(roms_base + hdr->roms_count);
+    return MRDB_READ_UINT24(name_ids + (size_t)(rom - roms_base) * 3);
+}
+
+/**
+ * Look up a ROM by size and SHA1 (perfect hash over the ROMs of that size).
  *
  * @param db        Pointer to the database
  * @param size_pow2 ROM size as power of 2 (e.g., 21 for 2MB)
  * @param sha1      20-byte SHA1 hash to search for
+ * @param rom_id    If not NULL, receives the 24-bit ROM ID when found
  * @return          Pointer to matching MrdbRom entry, or NULL if not found
  */
-const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1);
+const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const uint8_t* sha1,
+                                     uint32_t* rom_id);
 
 /**
- * Get ROM ID from a ROM pointer.
+ * Get ROM ID from a ROM pointer (mrdb_find_rom_by_sha1 can return it directly).
  *
  * @param db  Pointer to the database
  * @param rom Pointer to the ROM entry
@@ -210,27 +318,33 @@ const MrdbRom* mrdb_find_rom_by_sha1(const uint8_t* db, uint8_t size_pow2, const
  */
 static inline uint32_t mrdb_get_rom_id(const uint8_t* db, const MrdbRom* rom) {
     const MrdbHeader* hdr = mrdb_get_header(db);
-    const MrdbRom* roms_base = mrdb_get_roms(db);
-    uint32_t index = (uint32_t)(rom - roms_base);
+    uint32_t rom_index = (uint32_t)(rom - mrdb_get_roms(db));
 
-    // Find size_pow2 from the size index
+    // Find size_pow2 from the size index: sizes are stored in ascending
+    // index order, so binary search for the last one starting at or before
+    // rom_index (empty sizes share their start with the next one and are skipped)
     const MrdbSizeIndex* size_idx = mrdb_get_size_index(db);
-    for (uint8_t sp = hdr->min_size_pow2; sp <= hdr->max_size_pow2; sp++) {
-        uint32_t start = size_idx[sp - hdr->min_size_pow2].start_offset / MRDB_ROM_ENTRY_SIZE;
-        uint32_t end = size_idx[sp - hdr->min_size_pow2].end_offset / MRDB_ROM_ENTRY_SIZE;
-        if (index >= start && index < end) {
-            return MRDB_MAKE_ROM_ID(sp, index - start);
+    uint32_t sel = 0;
+    uint32_t n = MRDB_NUM_SIZES;
+    while (n > 1) {
+        uint32_t half = n / 2;
+        if (size_idx[sel + half].start_index <= rom_index) {
+            sel += half;
         }
+        n -= half;
+    }
+
+    uint32_t start = size_idx[sel].start_index;
+    if (rom_index < start || rom_index - start >= size_idx[sel].count) {
+        return MRDB_NULL_ID_24;
     }
-    return MRDB_NULL_ID_24;
+    return MRDB_MAKE_ROM_ID(hdr->min_size_pow2 + sel, rom_index - start);
 }
 
 // ============================================================================
 // Machine lookup functions
 // ============================================================================
 
-#define MRDB_MACHINE_ROM_ENTRY_SIZE 8  // machine_id(2) + rom_id(3) + name_id(3)
-
 /**
  * Result structure for machine lookup.
  */
@@ -244,7 +358,7 @@ typedef struct {
  *
  * @param db          Pointer to the database
  * @param rom         Pointer to the ROM entry (from mrdb_find_rom_by_sha1)
- * @param size_pow2   Size of the ROM (power of 2)
+ * @param size_pow2   Size of the ROM (power of 2), unused: the ROM pointer is enough
  * @param results     Array to store results
  * @param max_results Maximum number of results to return
  * @return            Number of machines found (may be > max_results if truncated)
@@ -253,20 +367,57 @@ uint32_t mrdb_get_machines_for_rom(const uint8_t* db, const MrdbRom* rom,
                                     uint8_t size_pow2, MrdbMachineResult* results,
                                     uint32_t max_results);
 
+/**
+ * Get all machines associated with a ROM ID (from mrdb_find_rom_by_sha1).
+ *
+ * @param db          Pointer to the database
+ * @param rom_id      24-bit ROM ID
+ * @param results     Array to store results
+ * @param max_results Maximum number of results to return
+ * @return            Number of machines found (may be > max_results if truncated)
+ */
+uint32_t mrdb_get_machines_for_rom_id(const uint8_t* db, uint32_t rom_id,
+                                       MrdbMachineResult* results, uint32_t max_results);
+
 /**
  * Get machine name.
  */
 const char* mrdb_get_machine_name(const uint8_t* db, uint32_t machine_id);
 
+// Inflate window for descriptions: the shared dictionary followed by room
+// for the longest description
+#define MRDB_DESC_WINDOW_SIZE (MRDB_DESC_DICT_SIZE + MRDB_DESC_MAX_LENGTH + 1)
+
+/**
+ * Description decompression context, one per core or thread. Zero it (or
+ * set db to NULL) before first use: the dictionary is then copied into the
+ * window on the first call for a database, and kept for the next ones.
+ */
+typedef struct {
+    const uint8_t* db;                     // Database whose dictionary is in window
+    uint8_t window[MRDB_DESC_WINDOW_SIZE];
+} MrdbDescContext;
+
 /**
- * Get machine description (decompresses zlib data).
+ * Get machine description (inflates deflate data primed with the shared
+ * dictionary). Reentrant: all state is in the caller's context.
  *
  * @param db          Pointer to the database
  * @param machine_id  Machine ID
  * @param buffer      Output buffer for decompressed description
- * @param buffer_size Size of output buffer
+ * @param buffer_size Size of output buffer (longer descriptions are truncated)
+ * @param ctx         Decompression context (not shared between concurrent calls)
  * @return            Length of description, or 0 if failed/empty
  */
+uint32_t mrdb_get_machine_description_r(const uint8_t* db, uint32_t machine_id,
+                                         char* buffer, uint32_t buffer_size,
+                                         MrdbDescContext* ctx);
+
+/**
+ * Get machine description with a static context (about 16 KB of RAM,
+ * not reentrant: use mrdb_get_machine_description_r from several cores,
+ * threads or interrupt handlers).
+ */
 uint32_t mrdb_get_machine_description(const uint8_t* db, uint32_t machine_id,
                                        char* buffer, uint32_t buffer_size);
 